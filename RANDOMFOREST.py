@@ -1,29 +1,21 @@
 import pandas as pd
 import numpy as np
-import ast
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, log_loss, classification_report
+from featureStore import read_table
+from tabularFeatures import parse_seat_counts, parse_doc_prob
 
 # Set display options for debugging/visibility
 pd.set_option('display.max_columns', None)
 pd.set_option('display.max_colwidth', None)
 pd.set_option('display.width', 1000)
 
-# Load the Excel file (assumes a "bill_id" column exists)
-df = pd.read_excel("data_with_status_doc_prob.xlsx")
-print("Columns in Excel:", df.columns.tolist())
+# Load the feature table (assumes a "bill_id" column exists)
+df = read_table("data_with_status_doc_prob")
+print("Columns in table:", df.columns.tolist())
 print(df.head())
 
-# Function to safely parse the seat_counts column (stored as a stringified dictionary)
-def parse_seat_counts(val):
-    if pd.isnull(val):
-        return {}
-    try:
-        return ast.literal_eval(val)
-    except Exception:
-        return {}
-
 df["seat_counts_parsed"] = df["seat_counts"].apply(parse_seat_counts)
 df["Labour_seats"] = df["seat_counts_parsed"].apply(lambda d: d.get("Labour", 0))
 df["Conservative_seats"] = df["seat_counts_parsed"].apply(lambda d: d.get("Conservative", 0))
@@ -32,17 +24,6 @@ df["LibDem_seats"] = df["seat_counts_parsed"].apply(lambda d: d.get("Liberal Dem
 # Filter data to include only rows with progress_status 1 or 2
 df_model = df[df["progress_status"].isin([1, 2])].copy()
 
-# Function to parse the doc_prob column (string to list of floats)
-def parse_doc_prob(val):
-    if pd.isnull(val):
-        return []
-    try:
-        val = val.strip("[]")
-        parts = val.split()
-        return [float(x) for x in parts]
-    except Exception:
-        return []
-
 df_model["doc_prob_parsed"] = df_model["doc_prob"].apply(parse_doc_prob)
 doc_prob_df = pd.DataFrame(df_model["doc_prob_parsed"].tolist(), index=df_model.index)
 doc_prob_df.columns = ["doc_prob1", "doc_prob2", "doc_prob3", "doc_prob4"]
@@ -1,22 +1,29 @@
+import sys
+
 import pandas as pd
 
-# 1. Load the status file which has 'bill_id' and 'status'
-df_status = pd.read_excel("data_with_status_doc_prob.xlsx", usecols=["bill_id", "status"])
+from featureStore import read_table, write_table
+
+export_excel = "--excel" in sys.argv
+
+# 1. Load the status table, only its 'bill_id' and 'status' columns
+df_status = read_table("data_with_status_doc_prob", columns=["bill_id", "status"])
 
 # 2. Process the training file
-# Load the training probabilities file
-df_training = pd.read_excel("merged_probabilities_training.xlsx")
+# Load the training probabilities table
+df_training = read_table("merged_probabilities_training")
 # Merge on 'bill_id' to add the 'status' column
 df_training_status = pd.merge(df_training, df_status, on="bill_id", how="left")
-# Save the updated training file with status
-df_training_status.to_excel("merged_probabilities_training_with_status.xlsx", index=False)
+# Save the updated training table with status
+training_path = write_table(df_training_status, "merged_probabilities_training_with_status", excel=export_excel)
 
 # 3. Process the validation file
-# Load the validation probabilities file
-df_validation = pd.read_excel("validation_probabilities_training.xlsx")
+# Load the validation probabilities table
+df_validation = read_table("validation_probabilities_training")
 # Merge on 'bill_id' to add the 'status' column
 df_validation_status = pd.merge(df_validation, df_status, on="bill_id", how="left")
-# Save the updated validation file with status
-df_validation_status.to_excel("validation_probabilities_training_with_status.xlsx", index=False)
+# Save the updated validation table with status
+validation_path = write_table(df_validation_status, "validation_probabilities_training_with_status",
+                              excel=export_excel)
 
-print("Updated files created: merged_probabilities_training_with_status.xlsx and validation_probabilities_training_with_status.xlsx")
+print(f"Updated tables created: {training_path} and {validation_path}")
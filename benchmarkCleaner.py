@@ -0,0 +1,117 @@
+import glob
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+from benchmarkSuite import peak_rss_mb
+from billText import iter_clean_flat_text
+
+BENCH_GLOB = os.path.join("billTextDownload", "*", "*.pdf")
+# The largest bills are the ones that blew up memory, so benchmark those
+LARGEST_N = 20
+
+
+def legacy_clean_text(full_text):
+    """
+    The original regex pipeline, applied to the pages joined with spaces.
+    """
+    full_text = full_text.replace("\n", " ").strip()
+    full_text = re.sub(r"\([^)]*\)", "", full_text)
+    full_text = re.sub(r"\b\d+\b", "", full_text)
+    full_text = re.sub(r"[^a-zA-Z.,; ]", " ", full_text)
+    full_text = re.sub(r"\s+", " ", full_text)
+    return full_text.lower().strip()
+
+
+def legacy_extract_clean_flat_text(pdf_path):
+    """
+    The original whole-document cleaner, kept here as the reference for output and speed.
+    """
+    import fitz
+    try:
+        doc = fitz.open(pdf_path)
+
+        if doc.page_count > 2:
+            pages = [doc[i].get_text() for i in range(1, doc.page_count - 1)]
+        else:
+            pages = []
+
+        doc.close()
+
+        return legacy_clean_text(" ".join(pages))
+
+    except fitz.EmptyFileError:
+        print(f"Warning: The file {pdf_path} is empty and cannot be processed.")
+    except Exception as e:
+        print(f"Error processing file {pdf_path}: {e}")
+
+    return ""
+
+
+def run_legacy(pdf_paths, out_path):
+    with open(out_path, "w", encoding="utf-8") as f:
+        for pdf_path in pdf_paths:
+            f.write(legacy_extract_clean_flat_text(pdf_path) + "\n")
+
+
+def run_streaming(pdf_paths, out_path):
+    # Write each page's text as soon as it is cleaned, the way the text cache does
+    with open(out_path, "w", encoding="utf-8") as f:
+        for pdf_path in pdf_paths:
+            for chunk in iter_clean_flat_text(pdf_path):
+                f.write(chunk)
+            f.write("\n")
+
+
+def _bench_worker(name, pdf_paths, out_path, results):
+    run = run_legacy if name == "legacy" else run_streaming
+    start = time.perf_counter()
+    run(pdf_paths, out_path)
+    results[name] = (time.perf_counter() - start, peak_rss_mb())
+
+
+def benchmark(pdf_paths):
+    """
+    Run both cleaners over pdf_paths, each in a fresh process so peak RSS is not shared,
+    check that their outputs are byte-identical and print pages/s and peak RSS.
+    """
+    import fitz
+    pages = 0
+    for pdf_path in pdf_paths:
+        with fitz.open(pdf_path) as doc:
+            pages += max(doc.page_count - 2, 0)
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Manager().dict()
+    outputs = {}
+    for name in ("legacy", "streaming"):
+        outputs[name] = f"bench_cleaner_{name}.txt"
+        process = ctx.Process(target=_bench_worker, args=(name, pdf_paths, outputs[name], results))
+        process.start()
+        process.join()
+
+    with open(outputs["legacy"], "rb") as f:
+        legacy_bytes = f.read()
+    with open(outputs["streaming"], "rb") as f:
+        identical = f.read() == legacy_bytes
+    for path in outputs.values():
+        os.remove(path)
+
+    print(f"{len(pdf_paths)} PDFs, {pages} pages cleaned")
+    for name in ("legacy", "streaming"):
+        seconds, rss = results[name]
+        rss_text = f"{rss:.1f} MB" if rss is not None else "n/a"
+        print(f"{name:>9}: {seconds:.2f}s, {pages / seconds:.1f} pages/s, peak RSS {rss_text}")
+    print("Outputs byte-identical:", identical)
+    return identical
+
+
+if __name__ == "__main__":
+    pdf_paths = sorted(glob.glob(BENCH_GLOB), key=os.path.getsize, reverse=True)[:LARGEST_N]
+    if not pdf_paths:
+        print(f"No PDFs found under {BENCH_GLOB}")
+        sys.exit(1)
+    if not benchmark(pdf_paths):
+        sys.exit(1)
@@ -0,0 +1,96 @@
+import sys
+import time
+
+import numpy as np
+from gensim.models import Word2Vec
+
+from pairScoreCache import PairScoreCache
+from tokenCorpus import text_file_corpus
+from w2vScoring import (CATEGORIES, MODEL_PATHS, score_document, score_document_reference,
+                        MultiModelScorer, classify_document, classify_document_early_exit)
+
+BILLS_PER_CATEGORY = 3
+WINDOW = 7
+# The reference accumulates float32 logs pair by pair, so only float32-level agreement is expected
+RTOL = 1e-5
+ATOL = 1e-3
+
+
+def load_test_bills(bills_per_category=BILLS_PER_CATEGORY):
+    """
+    The first few bills of each category's test set, as lists of tokenized sentences.
+    """
+    documents = []
+    for code in CATEGORIES.values():
+        corpus = text_file_corpus(f"cleanedTextFull/{code}/Testing/testing_text{code}.txt", with_ids=True)
+        for i in range(min(bills_per_category, len(corpus))):
+            documents.append(corpus.document_words(i))
+    return documents
+
+
+def check_against_reference(documents, models, window=WINDOW):
+    """
+    Regression check: the per-model vectorized, stacked multi-model and pair-cached scores
+    must all match the original per-pair scorer. Returns (passed, seconds per scorer).
+    """
+    scorer = MultiModelScorer(models, window)
+    pair_caches = {key: PairScoreCache(model) for key, model in models.items()}
+    scorers = {
+        "reference": lambda sentences: score_document_reference(sentences, models, window),
+        "vectorized": lambda sentences: score_document(sentences, models, window),
+        "multi-model": scorer.score_document,
+        "pair-cached": lambda sentences: score_document(sentences, models, window, pair_caches),
+    }
+    seconds = dict.fromkeys(scorers, 0.0)
+    passed = True
+    for i, sentences in enumerate(documents):
+        scores = {}
+        for name, score in scorers.items():
+            start = time.perf_counter()
+            scores[name] = score(sentences)
+            seconds[name] += time.perf_counter() - start
+
+        for name in ("vectorized", "multi-model", "pair-cached"):
+            if not np.allclose(scores[name], scores["reference"], rtol=RTOL, atol=ATOL):
+                worst = np.max(np.abs(scores[name] - scores["reference"]))
+                print(f"Bill {i}: {name} scores differ from the reference (max abs difference {worst})")
+                passed = False
+    for key, cache in pair_caches.items():
+        print(f"{key} pair cache: {cache.stats()}")
+    return passed, seconds
+
+
+def check_early_exit(documents, models, window=WINDOW):
+    """
+    How often early exit picks the same class as scoring every sentence, and how many
+    sentences it scored. Returns (agreements, sentences scored, total sentences, seconds).
+    """
+    scorer = MultiModelScorer(models, window)
+    agreements, scored, total, seconds = 0, 0, 0, 0.0
+    for sentences in documents:
+        predicted_idx, _ = classify_document(scorer.score_document(sentences))
+        start = time.perf_counter()
+        early_idx, _, n_scored = classify_document_early_exit(sentences, scorer, window)
+        seconds += time.perf_counter() - start
+        agreements += int(early_idx == predicted_idx)
+        scored += n_scored
+        total += len(sentences)
+    return agreements, scored, total, seconds
+
+
+if __name__ == "__main__":
+    models = {key: Word2Vec.load(path) for key, path in MODEL_PATHS.items()}
+    documents = load_test_bills()
+    n_words = sum(len(sentence) for sentences in documents for sentence in sentences)
+
+    passed, seconds = check_against_reference(documents, models)
+    print(f"{len(documents)} bills, {n_words} words, {len(models)} models, window {WINDOW}")
+    for name, elapsed in seconds.items():
+        print(f"{name:>11}: {elapsed:.2f}s ({seconds['reference'] / elapsed:.1f}x the reference)")
+    print("Scores match the reference:", passed)
+
+    agreements, scored, total, early_seconds = check_early_exit(documents, models)
+    print(f" early exit: {early_seconds:.2f}s, scored {scored} of {total} sentences, "
+          f"same class as the full scorer for {agreements} of {len(documents)} bills")
+    if not passed:
+        sys.exit(1)
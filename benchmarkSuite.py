@@ -0,0 +1,406 @@
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+BASELINE_PATH = "benchmarkBaseline.json"
+# A stage regresses when it is this much slower, or peaks this much higher in memory, than the baseline
+REGRESSION_THRESHOLD = 0.25
+# Differences below these are timer and allocator noise, whatever the ratio
+MIN_SECONDS_DELTA = 0.002
+MIN_MB_DELTA = 1.0
+SEED = 0
+REPEATS = 5
+SENTENCE_SIZES = {"10": 10, "1k": 1000, "50k": 50000}
+WORDS_PER_SENTENCE = 12
+PARSE_ROWS = 100000
+PDF_PAGES = 20
+REAL_PDF_SAMPLE = 5
+BASE_MODEL_INPUT = "data_with_status_doc_prob"
+BASE_MODEL_SCRIPTS = ["LOGISTICREGRESSION.py", "RANDOMFOREST.py", "GRADIENTBOOSTEDTREE"]
+
+
+def peak_rss_mb(children=False):
+    """
+    Peak resident set size of this process, or of its largest finished child, in MB,
+    or None if it cannot be read here.
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    if children:
+        return None
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+# Fixed-seed inputs
+
+def synthetic_vocab(n_words=5000):
+    rng = random.Random(SEED)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(n_words)]
+
+
+def titles_vocab():
+    # Words the shipped titles models know, so scored sentences exercise real vectors
+    from gensim.models import Word2Vec
+    from w2vScoring import TITLE_MODEL_PATHS
+    return Word2Vec.load(next(iter(TITLE_MODEL_PATHS.values()))).wv.index_to_key
+
+
+def synthetic_sentences(n_sentences, vocab, seed=SEED):
+    rng = random.Random(seed)
+    # Zipf-like draw: frequent words dominate as they do in bill text
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    words = rng.choices(vocab, weights=weights, k=n_sentences * WORDS_PER_SENTENCE)
+    return [words[i:i + WORDS_PER_SENTENCE] for i in range(0, len(words), WORDS_PER_SENTENCE)]
+
+
+def synthetic_bill_text(n_sentences, vocab=None):
+    return ". ".join(" ".join(sentence) for sentence in synthetic_sentences(n_sentences, vocab or synthetic_vocab()))
+
+
+def titles_models():
+    from gensim.models import Word2Vec
+    from w2vScoring import TITLE_MODEL_PATHS
+    return {key: Word2Vec.load(path) for key, path in TITLE_MODEL_PATHS.items()}
+
+
+# Stages: each builder does the untimed setup and returns (run, units, unit name)
+
+def stage_split_sentences(size):
+    from tokenCorpus import splitSentences
+    text = synthetic_bill_text(size)
+    return (lambda: splitSentences(text)), size, "sentences"
+
+
+def stage_clean_pages():
+    from billText import clean_pages
+    rng = random.Random(SEED)
+    vocab = synthetic_vocab()
+    # Page text the way PyMuPDF returns it: line breaks, numbers and bracketed references
+    pages = ["\n".join(" ".join(rng.choice(vocab) if rng.random() > 0.1 else f"({rng.randint(1, 99)})"
+                                for _ in range(14)) + "." for _ in range(45)) for _ in range(PDF_PAGES)]
+    return (lambda: "".join(clean_pages(pages))), len(pages), "pages"
+
+
+def stage_extract_synthetic_pdf():
+    import fitz
+    from billText import extract_clean_flat_text
+    path = os.path.join(tempfile.mkdtemp(), "synthetic_bill.pdf")
+    text = synthetic_bill_text(PDF_PAGES * 40).split(". ")
+    with fitz.open() as doc:
+        for page_number in range(PDF_PAGES):
+            page = doc.new_page()
+            page.insert_textbox(page.rect + (40, 40, -40, -40), ". ".join(text[page_number * 40:(page_number + 1) * 40]))
+        doc.save(path)
+    return (lambda: extract_clean_flat_text(path)), PDF_PAGES, "pages"
+
+
+def stage_extract_real_pdfs():
+    import fitz
+    from billText import extract_clean_flat_text
+    paths = sorted(glob.glob(os.path.join("billTextDownload", "*", "*.pdf")))[:REAL_PDF_SAMPLE]
+    if not paths:
+        raise FileNotFoundError("no PDFs under billTextDownload")
+    pages = 0
+    for path in paths:
+        with fitz.open(path) as doc:
+            pages += doc.page_count
+    return (lambda: [extract_clean_flat_text(path) for path in paths]), pages, "pages"
+
+
+def stage_score_sentence():
+    from w2vScoring import score_sentence
+    models = titles_models()
+    sentences = synthetic_sentences(1000, titles_vocab())
+
+    def run():
+        for sentence in sentences:
+            for model in models.values():
+                score_sentence(sentence, model, window=7)
+    return run, len(sentences), "sentences"
+
+
+def stage_score_document(size):
+    from w2vScoring import score_document
+    models = titles_models()
+    sentences = synthetic_sentences(size, titles_vocab())
+    return (lambda: score_document(sentences, models, window=7)), size, "sentences"
+
+
+def stage_multi_model_score_document(size):
+    from w2vScoring import MultiModelScorer
+    scorer = MultiModelScorer(titles_models())
+    sentences = synthetic_sentences(size, titles_vocab())
+    return (lambda: scorer.score_document(sentences, 7)), size, "sentences"
+
+
+def stage_score_real_bills():
+    from benchmarkScorer import load_test_bills
+    from w2vScoring import MultiModelScorer
+    documents = load_test_bills()
+    scorer = MultiModelScorer(titles_models())
+    n_sentences = sum(len(sentences) for sentences in documents)
+    return (lambda: [scorer.score_document(sentences, 7) for sentences in documents]), n_sentences, "sentences"
+
+
+def stage_parse_seat_counts():
+    from tabularFeatures import parse_seat_counts
+    rng = random.Random(SEED)
+    values = [None if rng.random() < 0.05 else
+              str({"Labour": rng.randint(150, 420), "Conservative": rng.randint(150, 400),
+                   "Liberal Democrat": rng.randint(10, 60)})
+              for _ in range(PARSE_ROWS)]
+    return (lambda: [parse_seat_counts(value) for value in values]), PARSE_ROWS, "rows"
+
+
+def stage_parse_doc_prob():
+    import numpy as np
+    from tabularFeatures import parse_doc_prob
+    rng = np.random.default_rng(SEED)
+    values = [str(row) for row in rng.dirichlet(np.ones(4), size=PARSE_ROWS)]
+    return (lambda: [parse_doc_prob(value) for value in values]), PARSE_ROWS, "rows"
+
+
+def stage_load_base_model_input(source):
+    """
+    Load the base models' input table from the feature store, or from its legacy workbook.
+    """
+    import pandas as pd
+    from featureStore import legacy_path, read_table
+    if source == "excel":
+        import openpyxl  # noqa: F401
+        if not os.path.exists(legacy_path(BASE_MODEL_INPUT)):
+            raise FileNotFoundError(legacy_path(BASE_MODEL_INPUT))
+        rows = len(pd.read_excel(legacy_path(BASE_MODEL_INPUT)))
+        return (lambda: pd.read_excel(legacy_path(BASE_MODEL_INPUT))), rows, "rows"
+    import pyarrow  # noqa: F401
+    rows = len(read_table(BASE_MODEL_INPUT))
+    return (lambda: read_table(BASE_MODEL_INPUT)), rows, "rows"
+
+
+def stage_train_base_model(script):
+    """
+    Run a base-model training script as it is run by hand, in a scratch folder so its
+    prediction files do not overwrite the real ones.
+    """
+    import pyarrow, sklearn  # noqa: F401 - the scripts need both, skip here rather than fail in the subprocess
+    from featureStore import FEATURE_STORE_DIR, read_table, table_path
+    read_table(BASE_MODEL_INPUT, columns=[])  # imports the legacy workbook if the store lacks it
+    repo_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(work_dir, FEATURE_STORE_DIR))
+    shutil.copy(table_path(BASE_MODEL_INPUT), os.path.join(work_dir, FEATURE_STORE_DIR))
+    env = dict(os.environ, PYTHONPATH=repo_dir)
+
+    def run():
+        subprocess.run([sys.executable, os.path.join(repo_dir, script)], cwd=work_dir, env=env,
+                       check=True, stdout=subprocess.DEVNULL)
+    return run, 1, "runs"
+
+
+STAGES = {
+    **{f"split_sentences_{label}": (stage_split_sentences, size) for label, size in SENTENCE_SIZES.items()},
+    "clean_pages": (stage_clean_pages,),
+    "extract_clean_flat_text_synthetic": (stage_extract_synthetic_pdf,),
+    "extract_clean_flat_text_real": (stage_extract_real_pdfs,),
+    "score_sentence": (stage_score_sentence,),
+    **{f"score_document_{label}": (stage_score_document, size) for label, size in SENTENCE_SIZES.items()},
+    **{f"multi_model_score_document_{label}": (stage_multi_model_score_document, size)
+       for label, size in SENTENCE_SIZES.items()},
+    "score_document_real": (stage_score_real_bills,),
+    "parse_seat_counts": (stage_parse_seat_counts,),
+    "parse_doc_prob": (stage_parse_doc_prob,),
+    **{f"load_base_model_input_{source}": (stage_load_base_model_input, source) for source in ("excel", "parquet")},
+    **{f"train_{os.path.splitext(script)[0].lower()}": (stage_train_base_model, script)
+       for script in BASE_MODEL_SCRIPTS},
+}
+# Stages whose work happens in a subprocess, so their memory is read from the children
+SUBPROCESS_STAGES = {name for name, (builder, *_) in STAGES.items() if builder is stage_train_base_model}
+
+
+def _measure(run, subprocess_stage):
+    if subprocess_stage:
+        seconds = min(timeit.repeat(run, number=1, repeat=1))
+        return seconds, peak_rss_mb(children=True)
+    run()  # warm up caches and lazy imports
+    number, _ = timeit.Timer(run).autorange()
+    seconds = min(timeit.repeat(run, number=number, repeat=REPEATS)) / number
+    # Measured in a separate pass, tracing would distort the timings
+    tracemalloc.start()
+    run()
+    peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return seconds, peak_mb
+
+
+def _stage_worker(name, results):
+    builder, *args = STAGES[name]
+    try:
+        run, units, unit_name = builder(*args)
+        seconds, peak_mb = _measure(run, name in SUBPROCESS_STAGES)
+    except (ImportError, FileNotFoundError, LookupError) as e:
+        # A missing optional dependency, data file or NLTK corpus on this machine
+        reason = next((line.strip() for line in str(e).splitlines() if line.strip(" *")), "")
+        results[name] = {"skipped": f"{type(e).__name__}: {reason}"}
+        return
+    except Exception as e:
+        results[name] = {"failed": f"{type(e).__name__}: {e}"}
+        return
+    results[name] = {"seconds": seconds, "units": units, "unit": unit_name,
+                     "units_per_second": units / seconds, "peak_mb": peak_mb, "rss_mb": peak_rss_mb()}
+
+
+def run_stages(names):
+    """
+    Run each stage in a fresh process, so imports and memory of one do not leak into the next.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Manager().dict()
+    for name in names:
+        process = ctx.Process(target=_stage_worker, args=(name, results))
+        process.start()
+        process.join()
+        if name not in results:
+            results[name] = {"failed": f"worker exited with code {process.exitcode}"}
+    return {name: results[name] for name in names}
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Stage names that are slower, or peak higher in memory, than the baseline by more than threshold.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("stages", {}).get(name)
+        if "seconds" not in result or not base or "seconds" not in base:
+            continue
+        slower = (result["seconds"] > base["seconds"] * (1 + threshold)
+                  and result["seconds"] - base["seconds"] > MIN_SECONDS_DELTA)
+        heavier = (result["peak_mb"] > base["peak_mb"] * (1 + threshold)
+                   and result["peak_mb"] - base["peak_mb"] > MIN_MB_DELTA)
+        if slower or heavier:
+            regressions.append(name)
+    return regressions
+
+
+def machine_info():
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()}
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = {
+        "machine": machine_info(),
+        "recorded": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "stages": results,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def print_results(results, baseline=None):
+    base_stages = (baseline or {}).get("stages", {})
+    for name, result in results.items():
+        if "seconds" not in result:
+            status = "skipped" if "skipped" in result else "FAILED"
+            print(f"{name:>36}: {status} ({result.get('skipped', result.get('failed'))})")
+            continue
+        line = (f"{name:>36}: {result['seconds'] * 1000:10.2f} ms, "
+                f"{result['units_per_second']:12.1f} {result['unit']}/s, peak {result['peak_mb']:8.1f} MB")
+        base = base_stages.get(name)
+        if base and "seconds" in base:
+            line += f"  ({result['seconds'] / base['seconds']:.2f}x time, {result['peak_mb'] - base['peak_mb']:+.1f} MB)"
+        print(line)
+
+
+def uncovered_stages(results, baseline):
+    """
+    Stages the regression check cannot vouch for: skipped on this machine, or without a baseline timing.
+    """
+    base_stages = (baseline or {}).get("stages", {})
+    return [name for name, result in results.items()
+            if "seconds" not in result or "seconds" not in base_stages.get(name, {})]
+
+
+if __name__ == "__main__":
+    # python benchmarkSuite.py [--save-baseline] [--allow-missing] [--threshold 0.25] [stage name prefixes...]
+    # Without --save-baseline the stages are checked against benchmarkBaseline.json. No baseline
+    # is committed: record it with --save-baseline on the machine the check runs on, with fitz,
+    # nltk (and its stopwords), gensim, sklearn and the bill texts available so every stage is
+    # measured, since timings are only comparable on the same hardware. The check fails when the
+    # baseline is missing, and also when a stage is skipped or has no baseline timing, unless
+    # --allow-missing is given.
+    args = sys.argv[1:]
+    threshold = REGRESSION_THRESHOLD
+    if "--threshold" in args:
+        index = args.index("--threshold")
+        threshold = float(args[index + 1])
+        del args[index:index + 2]
+    save = "--save-baseline" in args
+    allow_missing = "--allow-missing" in args
+    prefixes = [arg for arg in args if not arg.startswith("--")]
+    names = [name for name in STAGES if not prefixes or name.startswith(tuple(prefixes))]
+
+    results = run_stages(names)
+    baseline = load_baseline()
+    print_results(results, baseline)
+    failed = [name for name, result in results.items() if "failed" in result]
+    skipped = [name for name, result in results.items() if "skipped" in result]
+
+    if failed:
+        print(f"Stages failed: {', '.join(failed)}")
+        sys.exit(1)
+    if save:
+        # Keep the baseline of stages that were not measured this time
+        measured = {name: result for name, result in results.items() if "seconds" in result}
+        merged = dict((baseline or {}).get("stages", {}), **measured)
+        save_baseline(merged)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        if skipped:
+            print(f"Not in the baseline, skipped on this machine: {', '.join(skipped)}")
+    elif baseline is None:
+        print(f"No baseline at {BASELINE_PATH}, nothing to check against; "
+              f"record one with --save-baseline on the target machine")
+        sys.exit(1)
+    else:
+        if baseline.get("machine") != machine_info():
+            print(f"Warning: the baseline was recorded on {baseline.get('machine')}, "
+                  f"timings may not be comparable with {machine_info()}")
+        uncovered = uncovered_stages(results, baseline)
+        if uncovered:
+            print(f"Not checked (skipped here or no baseline timing): {', '.join(uncovered)}")
+        regressions = compare(results, baseline, threshold)
+        if regressions:
+            print(f"Regressed by more than {threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        if uncovered and not allow_missing:
+            sys.exit(2)
+        print(f"No checked stage regressed by more than {threshold:.0%}")
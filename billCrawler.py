@@ -0,0 +1,202 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from billRecord import HEADERS, RequestFailed
+from crawlJournal import CrawlJournal
+from responseCache import get_response_cache, CacheMiss
+from getBillData import get_bill_details, get_unique_bill_ids
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """
+    Spaces requests to the same host at least 1 / requests_per_second apart,
+    shared across all worker threads.
+    """
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, host):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class BillCrawler:
+    """
+    Concurrent version of collect_bill_details.
+
+    Bills are processed by a pool of max_in_flight threads sharing one pooled
+    requests.Session. Every request goes through a per-host rate limiter and is
+    retried with exponential backoff on connection errors, timeouts, 429 and 5xx.
+    """
+
+    def __init__(self, max_in_flight=8, requests_per_second=10, max_retries=5,
+                 backoff_base=0.5, backoff_cap=60, timeout=30):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.limiter = HostRateLimiter(requests_per_second)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_in_flight)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.failed_ids = []
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """
+        Delay before the given retry attempt: the server's Retry-After if it sent one,
+        otherwise base * 2**attempt with jitter, capped at backoff_cap.
+        """
+        if retry_after:
+            try:
+                return min(self.backoff_cap, float(retry_after))
+            except ValueError:
+                pass
+        delay = min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def get_json(self, url, params=None, use_cache=True):
+        """
+        Drop-in replacement for billRecord.get_json with rate limiting and retries.
+        Returns None for permanent failures (e.g. 404) and raises RequestFailed once
+        the retries for a transient failure are used up.
+        """
+        cache = get_response_cache() if use_cache else None
+        if cache is not None:
+            try:
+                hit, data = cache.lookup(url, params)
+            except CacheMiss as e:
+                raise RequestFailed(str(e))
+            if hit:
+                return data
+
+        host = urlparse(url).netloc
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff_delay(attempt - 1, retry_after))
+            retry_after = None
+
+            self.limiter.wait(host)
+            try:
+                response = self.session.get(url, headers=HEADERS, params=params, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = str(e)
+                continue
+
+            if response.status_code == 200:
+                try:
+                    data = response.json()
+                except ValueError:
+                    print(f"Error: Response from {url} is not valid JSON. Response:", response.text)
+                    return None
+                if cache is not None:
+                    cache.store(url, data, params)
+                return data
+            if response.status_code == 404 and cache is not None:
+                cache.store(url, None, params)
+            if response.status_code not in RETRY_STATUS_CODES:
+                print(f"Error: {url} returned status code {response.status_code}")
+                return None
+
+            error = f"status code {response.status_code}"
+            retry_after = response.headers.get("Retry-After")
+
+        raise RequestFailed(f"{url} failed after {self.max_retries + 1} attempts ({error})")
+
+    def _process(self, bill_id, get_details):
+        try:
+            info = get_details(bill_id, self.get_json)
+        except RequestFailed as e:
+            print(f"Giving up on bill id {bill_id} for now: {e}")
+            return bill_id, None, True
+        if info is None:
+            print(f"No data for bill id {bill_id}")
+        return bill_id, info, False
+
+    def crawl(self, bill_ids, get_details=get_bill_details, journal=None):
+        """
+        Run get_details(bill_id, fetch) for every bill id with at most max_in_flight
+        bills in progress. Returns the non-empty records in input order; ids that
+        still failed after all retries are left in self.failed_ids.
+        With a journal, ids already journalled are skipped and each new record is
+        appended as soon as it arrives.
+        """
+        self.failed_ids = []
+        results = []
+        if journal is not None:
+            bill_ids = journal.pending(bill_ids)
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            for bill_id, info, failed in executor.map(lambda b: self._process(b, get_details), bill_ids):
+                if failed:
+                    self.failed_ids.append(bill_id)
+                elif info is not None:
+                    if journal is not None:
+                        journal.append(info)
+                    results.append(info)
+        return results
+
+
+def crawl_bill_details(bill_ids, max_in_flight=8, requests_per_second=10, max_retries=5, journal=None):
+    """
+    Concurrent equivalent of getBillData.collect_bill_details: returns the same list
+    of bill dicts. Bills that fail transiently are retried in a final slower pass.
+    With a journal only the newly collected records are returned.
+    """
+    crawler = BillCrawler(max_in_flight, requests_per_second, max_retries)
+    results = crawler.crawl(bill_ids, journal=journal)
+
+    if crawler.failed_ids:
+        print(f"Retrying {len(crawler.failed_ids)} failed bills with a single worker.")
+        retry_crawler = BillCrawler(1, requests_per_second, max_retries * 2)
+        results.extend(retry_crawler.crawl(crawler.failed_ids, journal=journal))
+        if retry_crawler.failed_ids:
+            print(f"Bills still failing after retries: {retry_crawler.failed_ids}")
+
+        order = {bill_id: i for i, bill_id in enumerate(bill_ids)}
+        results.sort(key=lambda info: order[info["bill_id"]])
+
+    return results
+
+
+if __name__ == "__main__":
+    csv_files = [
+        "18_17 to 39.csv",
+        "19_17 to 39.csv",
+        "28_17 to 39.csv",
+        "29_17 to 39.csv"
+    ]
+
+    unique_bill_ids = get_unique_bill_ids(csv_files)
+    print(f"Found {len(unique_bill_ids)} unique bill IDs.")
+
+    journal = CrawlJournal()
+    print(f"{len(journal)} bills already collected.")
+    crawl_bill_details(unique_bill_ids, journal=journal)
+
+    output_excel = "collected_bills_data.xlsx"
+    journal.compact(output_excel)
+
+    print(f"Bill details saved to {output_excel}")
@@ -0,0 +1,91 @@
+import pandas as pd
+
+from billRecord import (get_json, iter_bill_summaries, fetch_bill_record, progress_status,
+                        first_sponsor_party, introduced_date_from_stages)
+
+# The list endpoint accepts large pages, so a whole session is a handful of requests
+DISCOVERY_PAGE_SIZE = 250
+
+
+def summary_fields(summary):
+    """
+    Bill fields that can be read straight from a /Bills list item, in the same
+    shape as the per-bill records. The list does not carry the long title,
+    sponsors or stage sittings; those still need a detail call.
+    """
+    return {
+        "bill_id": summary.get("billId"),
+        "short_title": summary.get("shortTitle", "N/A"),
+        "originating_house": summary.get("originatingHouse", "N/A"),
+        "current_house": summary.get("currentHouse", "N/A"),
+        "progress_status": progress_status(summary),
+        "sessionID": summary.get("introducedSessionId", "N/A"),
+        "last_update": summary.get("lastUpdate"),
+    }
+
+
+def discover_session_bills(session_id, take=DISCOVERY_PAGE_SIZE, fetch=get_json):
+    """
+    All bills listed under a session, read from the paged list endpoint.
+    """
+    return [summary_fields(summary)
+            for summary in iter_bill_summaries({"Session": session_id}, take=take, fetch=fetch)]
+
+
+def discover_bills(sessions, take=DISCOVERY_PAGE_SIZE, fetch=get_json):
+    """
+    Bills of every session in sessions, keyed by bill id.
+    A bill carried over between sessions is listed under each of them but kept once.
+    """
+    bills = {}
+    for session_id in sessions:
+        session_bills = discover_session_bills(session_id, take, fetch)
+        print(f"Session {session_id}: {len(session_bills)} bills")
+        for bill in session_bills:
+            bills.setdefault(bill["bill_id"], bill)
+    return bills
+
+
+# Fields only the per-bill calls carry: the detail JSON, and the stages for the introduced date
+DETAIL_FIELDS = ("long_title", "sponsor_party", "introduced_date")
+
+
+def add_detail_fields(bill, fields=DETAIL_FIELDS, fetch=get_json):
+    """
+    Fill in the given fields the list endpoint does not carry (long title, sponsor party,
+    introduced date) from the bill's detail, fetching its stages only for the introduced
+    date. Fields the bill already has are kept and cost no request. Returns None if the
+    detail call fails.
+    """
+    missing = [field for field in fields if field not in bill]
+    if not missing:
+        return dict(bill)
+    record = fetch_bill_record(bill["bill_id"], include_stages="introduced_date" in missing, fetch=fetch)
+    if record is None:
+        return None
+    bill = dict(bill)
+    if "long_title" in missing:
+        bill["long_title"] = record["bill"].get("longTitle", "N/A")
+    if "sponsor_party" in missing:
+        bill["sponsor_party"] = first_sponsor_party(record["bill"])
+    if "introduced_date" in missing:
+        bill["introduced_date"] = introduced_date_from_stages(record["stages"], bill["bill_id"])
+    return bill
+
+
+def discover_bill_ids(sessions, take=DISCOVERY_PAGE_SIZE, fetch=get_json):
+    """
+    Sorted ids of every bill in the given sessions, replacing brute-force id range scans.
+    """
+    return sorted(discover_bills(sessions, take, fetch))
+
+
+if __name__ == "__main__":
+    start_session = 17
+    end_session = 39
+
+    bills = discover_bills(range(start_session, end_session + 1))
+    df = pd.DataFrame(sorted(bills.values(), key=lambda bill: bill["bill_id"]))
+    output_csv = f"discovered_bills_{start_session} to {end_session}.csv"
+    df.to_csv(output_csv, index=False)
+    print(f"Discovered {len(df)} bills, saved to {output_csv}")
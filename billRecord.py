@@ -0,0 +1,164 @@
+import requests
+
+from responseCache import get_response_cache, CacheMiss
+
+API_BASE_URL = "https://bills-api.parliament.uk/api/v1/Bills"
+HEADERS = {"accept": "application/json"}
+
+# One keep-alive session for every call made through get_json
+_session = requests.Session()
+
+
+class RequestFailed(Exception):
+    """
+    Raised by a fetch function when a request could not be completed, as opposed to
+    returning None for a bill that genuinely has no data. Callers should let it propagate
+    so the bill is retried rather than recorded as missing.
+    """
+
+
+def get_json(url, params=None, use_cache=True):
+    """
+    GET a Parliament API url and return the decoded JSON body.
+    Returns None if the request fails, the status is not 200 or the body is not JSON.
+    Responses are served from and stored in the shared on-disk response cache unless use_cache is False.
+    """
+    cache = get_response_cache() if use_cache else None
+    if cache is not None:
+        try:
+            hit, data = cache.lookup(url, params)
+        except CacheMiss as e:
+            raise RequestFailed(str(e))
+        if hit:
+            return data
+
+    try:
+        response = _session.get(url, headers=HEADERS, params=params)
+    except requests.exceptions.RequestException as e:
+        print(f"Error: request to {url} failed: {e}")
+        return None
+    if response.status_code == 404 and cache is not None:
+        cache.store(url, None, params)
+    if response.status_code != 200:
+        print(f"Error: {url} returned status code {response.status_code}")
+        return None
+    try:
+        data = response.json()
+    except ValueError:
+        print(f"Error: Response from {url} is not valid JSON. Response:", response.text)
+        return None
+    if cache is not None:
+        cache.store(url, data, params)
+    return data
+
+
+def fetch_bill_record(bill_id, include_stages=True, fetch=get_json):
+    """
+    Fetch everything we need about a bill in one go: the /Bills/{id} JSON and,
+    optionally, its /Stages items. All bill fields are derived from this record
+    so each bill costs at most two requests.
+    """
+    bill = fetch(f"{API_BASE_URL}/{bill_id}")
+    if not isinstance(bill, dict):
+        return None
+
+    stages = None
+    if include_stages:
+        data = fetch(f"{API_BASE_URL}/{bill_id}/Stages")
+        stages = data.get("items", []) if isinstance(data, dict) else []
+
+    return {"bill_id": bill_id, "bill": bill, "stages": stages}
+
+
+def iter_bill_summaries(params=None, take=100, fetch=get_json, use_cache=True):
+    """
+    Page through the /Bills list endpoint with the given filters and yield each bill summary.
+    A page that cannot be read raises RequestFailed rather than silently ending the listing.
+    """
+    skip = 0
+    while True:
+        page_params = dict(params or {}, Skip=skip, Take=take)
+        data = fetch(API_BASE_URL, page_params, use_cache=use_cache)
+        if not isinstance(data, dict):
+            raise RequestFailed(f"Could not read the Bills list page {page_params}")
+        items = data.get("items", [])
+        for item in items:
+            yield item
+        skip += len(items)
+        if not items or skip >= data.get("totalResults", 0):
+            return
+
+
+def invalidate_bill_record(bill_id):
+    """
+    Drop the cached /Bills/{id} and /Stages responses so the next fetch sees fresh data.
+    """
+    cache = get_response_cache()
+    cache.invalidate(f"{API_BASE_URL}/{bill_id}")
+    cache.invalidate(f"{API_BASE_URL}/{bill_id}/Stages")
+
+
+def progress_status(bill):
+    """
+    2 if the bill became an Act, 1 if it did not, 3 if the 'isAct' field is missing.
+    """
+    if "isAct" in bill:
+        return 2 if bill["isAct"] else 1
+    print(f"'isAct' field not found for Bill ID {bill.get('billId')}")
+    return 3
+
+
+def first_sponsor_party(bill, default="N/A"):
+    """
+    Party of the first sponsor listed under the bill's "sponsors" key.
+    """
+    sponsors = bill.get("sponsors") or []
+    if sponsors:
+        return (sponsors[0].get("member") or {}).get("party", default)
+    return default
+
+
+def introduced_date_from_stages(stages, bill_id=None):
+    """
+    Sort the stages by 'sortOrder' and return the date of the first stage
+    sitting of the earliest stage that has one.
+    """
+    if not stages:
+        print(f"No stages found for bill {bill_id}.")
+        return None
+
+    sorted_stages = sorted(stages, key=lambda stage: stage.get("sortOrder", float('inf')))
+    for stage in sorted_stages:
+        stage_sittings = stage.get("stageSittings", [])
+        if stage_sittings:
+            return stage_sittings[0].get("date", None)
+
+    print(f"No valid stage sitting dates found for bill {bill_id}.")
+    return None
+
+
+def current_stage_date(bill):
+    """
+    Date of the first sitting of the bill's current stage, if there is one.
+    """
+    current_stage = bill.get("currentStage") or {}
+    stage_sitting = current_stage.get("stageSitting", None)
+    if stage_sitting and isinstance(stage_sitting, list) and len(stage_sitting) > 0:
+        return stage_sitting[0].get("date", None)
+    return None
+
+
+def bill_info_from_record(record):
+    """
+    Build the per-bill dict used by collect_bill_details from a fetched record.
+    """
+    bill = record["bill"]
+    bill_id = record["bill_id"]
+    return {
+        "bill_id": bill_id,
+        "originating_house": bill.get("originatingHouse", "N/A"),
+        "progress_status": progress_status(bill),
+        "sessionID": bill.get("introducedSessionId", "N/A"),
+        "introduced_date": introduced_date_from_stages(record["stages"], bill_id),
+        "sponsor_party": first_sponsor_party(bill),
+    }
@@ -0,0 +1,298 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from fileHash import file_sha256
+
+# Bump whenever the cleaner changes its output so cached texts are rebuilt
+CLEANER_VERSION = 1
+TEXT_CACHE_DIR = "cleanedTextCache"
+
+
+_DIGIT_RUN = re.compile(r"\b\d+\b")
+# Steps 4 and 5 of the original cleaner in one pass: every run of characters outside
+# [a-zA-Z.,;] (spaces included) collapses to a single space
+_NOT_KEPT = re.compile(r"[^a-zA-Z.,;]+")
+
+
+def _is_word_char(c):
+    # Same test the re module uses for \w on str patterns
+    return c.isalnum() or c == "_"
+
+
+class StreamingCleaner:
+    """
+    Incremental version of the bill text cleaner. Text is fed a page at a time and
+    the cleaned text comes back as soon as it is final. Concatenating every feed()
+    and finish() result gives exactly what the whole-document cleaner returned for
+    the same pages:
+
+        remove "(...)" groups, remove standalone digit runs, turn everything outside
+        [a-zA-Z.,; ] into spaces, collapse whitespace, lowercase, strip
+
+    Only a small tail is held back between feeds: a trailing run of word characters
+    (a digit run's fate depends on the character after it), one pending space, and
+    the text after an unclosed "(" which is dropped if a ")" turns up later and
+    kept otherwise.
+    """
+
+    def __init__(self):
+        self.in_paren = False
+        self.paren_text = []
+        self.word_tail = ""
+        self.started = False
+        self.space_pending = False
+
+    def _remove_parens(self, text):
+        out = []
+        pos = 0
+        while True:
+            if self.in_paren:
+                end = text.find(")", pos)
+                if end == -1:
+                    self.paren_text.append(text[pos:])
+                    return "".join(out)
+                self.in_paren = False
+                self.paren_text = []
+                pos = end + 1
+            else:
+                start = text.find("(", pos)
+                if start == -1:
+                    out.append(text[pos:])
+                    return "".join(out)
+                out.append(text[pos:start])
+                self.in_paren = True
+                # Keep the "(" itself in case it is never closed
+                self.paren_text = ["("]
+                pos = start + 1
+
+    def _remove_digits(self, text, final=False):
+        text = self.word_tail + text
+        cut = len(text)
+        if not final:
+            while cut and _is_word_char(text[cut - 1]):
+                cut -= 1
+        self.word_tail = text[cut:]
+        # Whatever precedes the processed text ends in a non-word character, so a \b at
+        # its start means the same as it did in the whole document
+        return _DIGIT_RUN.sub("", text[:cut])
+
+    def _collapse(self, text):
+        text = _NOT_KEPT.sub(" ", text).lower()
+        core = text.strip(" ")
+        if not core:
+            self.space_pending = self.space_pending or bool(text)
+            return ""
+        prefix = " " if self.started and (self.space_pending or text[0] == " ") else ""
+        self.started = True
+        self.space_pending = text[-1] == " "
+        return prefix + core
+
+    def feed(self, text):
+        """
+        Clean the next piece of the document; returns the cleaned text that is now final.
+        """
+        return self._collapse(self._remove_digits(self._remove_parens(text.replace("\n", " "))))
+
+    def finish(self):
+        """
+        Flush what was held back at the end of the document.
+        """
+        # An unclosed "(" never matched, so everything after it stays
+        tail = "".join(self.paren_text) if self.in_paren else ""
+        self.in_paren = False
+        self.paren_text = []
+        return self._collapse(self._remove_digits(tail, final=True))
+
+
+def clean_pages(pages):
+    """
+    Yield the cleaned text of a sequence of page texts piece by piece,
+    as if the pages had been joined with spaces and cleaned in one go.
+    """
+    cleaner = StreamingCleaner()
+    for i, page in enumerate(pages):
+        chunk = cleaner.feed(page if i == 0 else " " + page)
+        if chunk:
+            yield chunk
+    chunk = cleaner.finish()
+    if chunk:
+        yield chunk
+
+
+def iter_clean_flat_text(pdf_path):
+    """
+    Yield the cleaned text of a bill PDF one page at a time, skipping the first and last pages.
+    Errors opening or reading the PDF propagate to the caller.
+    """
+    # Imported here so the cleaner itself does not need PyMuPDF
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        if doc.page_count > 2:
+            yield from clean_pages(doc[i].get_text() for i in range(1, doc.page_count - 1))
+
+
+def _report_extract_error(pdf_path, e):
+    import fitz
+    if isinstance(e, fitz.EmptyFileError):
+        print(f"Warning: The file {pdf_path} is empty and cannot be processed.")
+    else:
+        print(f"Error processing file {pdf_path}: {e}")
+
+
+def extract_clean_flat_text(pdf_path):
+    try:
+        return "".join(iter_clean_flat_text(pdf_path))
+    except Exception as e:
+        _report_extract_error(pdf_path, e)
+
+    return ""
+
+
+def splitIntoSets(code):
+    """
+    Split the bills of a category csv into (training, testing, validation) id lists:
+    the first 10% is the test set, the rest is shuffled and split into validation and training.
+    """
+    csv_path = f"{code}_17 to 39.csv"
+
+    df = pd.read_csv(csv_path)
+
+    total_rows = len(df)
+    testingSetSize = round(0.1 * total_rows)
+
+    testingSet = df.iloc[:testingSetSize]['Bill Id'].tolist()
+
+    remaining_df = df.iloc[testingSetSize:].sample(frac=1, random_state=42)
+
+    validationSet = remaining_df.iloc[:testingSetSize]['Bill Id'].tolist()
+
+    trainingSet = remaining_df.iloc[testingSetSize:]['Bill Id'].tolist()
+
+    return trainingSet, testingSet, validationSet
+
+
+def count_sentences(text):
+    """ Utility function to count sentences in a given text. """
+    return len(re.split(r'(?<=[.!?]) +', text))
+
+
+def index_pdfs(folder):
+    """
+    Map each bill id to the PDFs in folder whose name ends in _{bill_id}.pdf, in listing order.
+    Built once per folder instead of rescanning the folder for every bill.
+    """
+    index = {}
+    for filename in os.listdir(folder):
+        if filename.endswith(".pdf"):
+            bill_number = filename[:-4].split('_')[-1]
+            try:
+                bill_number = int(bill_number)
+            except ValueError:
+                continue
+            index.setdefault(bill_number, []).append(os.path.join(folder, filename))
+    return index
+
+
+def cached_text_path(pdf_path, cache_dir=TEXT_CACHE_DIR):
+    """
+    Return the cache file holding the cleaned text of pdf_path, extracting it first if needed.
+    Entries are keyed by the PDF's SHA-256 and CLEANER_VERSION, so a re-downloaded or
+    renamed PDF with the same bytes is not extracted twice.
+    Only successful extractions are cached: if the PDF cannot be read the error is
+    reported and None is returned, so the next run tries it again.
+    """
+    try:
+        text_path = os.path.join(cache_dir, f"{file_sha256(pdf_path)}_v{CLEANER_VERSION}.txt")
+        if not os.path.exists(text_path):
+            tmp_path = f"{text_path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for chunk in iter_clean_flat_text(pdf_path):
+                        f.write(chunk)
+                os.replace(tmp_path, text_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    except Exception as e:
+        _report_extract_error(pdf_path, e)
+        return None
+    return text_path
+
+
+def read_cached_text(text_path):
+    with open(text_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def clean_pdfs(pdf_paths, cache_dir=TEXT_CACHE_DIR, max_workers=None):
+    """
+    Make sure every PDF in pdf_paths has a cached cleaned text, extracting the missing ones
+    across a process pool. Returns {pdf_path: cache file}, None for a PDF that could not be read.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    pdf_paths = list(dict.fromkeys(pdf_paths))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        text_paths = executor.map(cached_text_path, pdf_paths, [cache_dir] * len(pdf_paths), chunksize=4)
+        return dict(zip(pdf_paths, text_paths))
+
+
+def write_text_set(output_path, bill_ids, pdf_index, text_paths, with_ids=True):
+    """
+    Write the cleaned text of each bill to output_path, one line per PDF,
+    prefixed with "{bill_id}: " when with_ids is set. Returns the number of sentences written.
+    """
+    sentence_total = 0
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        for billID in bill_ids:
+            for pdf_path in pdf_index.get(billID, []):
+                if text_paths[pdf_path] is None:
+                    continue
+                extracted_text = read_cached_text(text_paths[pdf_path])
+                if extracted_text:
+                    sentence_total += count_sentences(extracted_text)
+                    output_file.write(f"{billID}: {extracted_text}\n" if with_ids else extracted_text + '\n')
+    return sentence_total
+
+
+def makeDataSets(codes, inBasePath, outputBase, cache_dir=TEXT_CACHE_DIR, max_workers=None):
+    total_sentences = 0
+    sentence_counts = {'training': 0, 'testing': 0, 'validation': 0}
+
+    for code in codes:
+        inPath = os.path.join(inBasePath, f"{code}_17 to 39")
+        outputPath = os.path.join(outputBase, f"{code}")
+
+        trainingIndexes, testingIndexes, validationIndexes = splitIntoSets(code)
+        pdf_index = index_pdfs(inPath)
+
+        needed = [pdf_path
+                  for billID in trainingIndexes + validationIndexes + testingIndexes
+                  for pdf_path in pdf_index.get(billID, [])]
+        text_paths = clean_pdfs(needed, cache_dir, max_workers)
+
+        sets = [
+            ('training', "Training", trainingIndexes, False),
+            ('validation', "Validation", validationIndexes, True),
+            ('testing', "Testing", testingIndexes, True),
+        ]
+        for name, folder, bill_ids, with_ids in sets:
+            text_path = os.path.join(outputPath, folder, f"{name}_text{code}.txt")
+            sentence_count = write_text_set(text_path, bill_ids, pdf_index, text_paths, with_ids)
+            sentence_counts[name] += sentence_count
+            total_sentences += sentence_count
+
+    print("Total sentences across all datasets:", total_sentences)
+    print("Sentences in Training data:", sentence_counts['training'])
+    print("Sentences in Testing data:", sentence_counts['testing'])
+    print("Sentences in Validation data:", sentence_counts['validation'])
+    return sentence_counts
+
+
+if __name__ == "__main__":
+    makeDataSets([18, 19, 28, 29],
+                 inBasePath=os.path.join("billTextDownload"),
+                 outputBase=os.path.join("cleanedTextFull"))
@@ -0,0 +1,121 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from modelRegistry import REGISTRY_DIR, export_compact_scorer, load_scorer
+from tokenCorpus import corpus_dir_for, dataframe_corpus
+from w2vScoring import CATEGORIES, classify_document
+
+VALIDATION_BASE = "cleanedTexWithID"
+COMPACT_PRECISIONS = ("float16", "int8")
+WINDOW = 7
+# Guardrails: a compact format is only exported if it changes at most this share of the
+# predicted classes and costs at most this much accuracy against the float32 vectors
+MAX_CLASS_CHANGE_RATE = 0.005
+MAX_ACCURACY_DROP = 0.002
+
+
+def validation_corpora(codes=CATEGORIES.values(), base=VALIDATION_BASE, text_column='extracted_text'):
+    """
+    [(category code, TokenCorpus)] of the validation CSV of every category that exists.
+    """
+    corpora = []
+    for code in codes:
+        path = os.path.join(base, str(code), "Validation", f"validation_text{code}.csv")
+        if not os.path.exists(path):
+            print(f"{path} not found, skipping")
+            continue
+        df = pd.read_csv(path, on_bad_lines='skip')
+        corpora.append((code, dataframe_corpus(df, text_column, corpus_dir_for(path))))
+    return corpora
+
+
+def predict_corpora(scorer, corpora, window=WINDOW):
+    """
+    (predicted class index, doc_probs) of every bill, as two arrays over all corpora.
+    A bill with no sentence to score is marked with class -1 and NaN doc_probs.
+    """
+    predicted, doc_probs = [], []
+    for _, corpus in corpora:
+        for i in range(len(corpus)):
+            sentence_scores = scorer.score_corpus_document(corpus, i, window)
+            if not len(sentence_scores):
+                predicted.append(-1)
+                doc_probs.append(np.full(len(scorer.categories), np.nan))
+                continue
+            predicted_idx, probs = classify_document(sentence_scores)
+            predicted.append(predicted_idx)
+            doc_probs.append(probs)
+    return np.asarray(predicted), np.asarray(doc_probs).reshape(len(predicted), len(scorer.categories))
+
+
+def evaluate(scorer, corpora, precisions=COMPACT_PRECISIONS, window=WINDOW):
+    """
+    Compare each compact precision with the float32 scorer on the validation corpora.
+    Bills with nothing to score are left out of every metric. Returns {precision: report
+    dict}, float32 included as the baseline.
+    """
+    codes = [CATEGORIES[category] for category in scorer.categories]
+    truth = np.concatenate([np.full(len(corpus), codes.index(code)) for code, corpus in corpora])
+    base_predicted, base_probs = predict_corpora(scorer, corpora, window)
+    # Whether a bill has sentences to score does not depend on the precision
+    scored = base_predicted >= 0
+    truth, base_predicted, base_probs = truth[scored], base_predicted[scored], base_probs[scored]
+    base_accuracy = float(np.mean(base_predicted == truth)) if len(truth) else 0.0
+
+    reports = {"float32": {"megabytes": scorer.nbytes() / 2**20, "bills_scored": int(scored.sum()),
+                           "accuracy": base_accuracy,
+                           "class_change_rate": 0.0, "max_abs_doc_prob_diff": 0.0,
+                           "mean_abs_doc_prob_diff": 0.0, "passed": True}}
+    for precision in precisions:
+        compact = scorer.with_precision(precision)
+        predicted, probs = predict_corpora(compact, corpora, window)
+        predicted, probs = predicted[scored], probs[scored]
+        diff = np.abs(probs - base_probs)
+        accuracy = float(np.mean(predicted == truth)) if len(truth) else 0.0
+        change_rate = float(np.mean(predicted != base_predicted)) if len(truth) else 0.0
+        reports[precision] = {
+            "megabytes": compact.nbytes() / 2**20,
+            "accuracy": accuracy,
+            "class_change_rate": change_rate,
+            "max_abs_doc_prob_diff": float(diff.max()) if diff.size else 0.0,
+            "mean_abs_doc_prob_diff": float(diff.mean()) if diff.size else 0.0,
+            "passed": change_rate <= MAX_CLASS_CHANGE_RATE and base_accuracy - accuracy <= MAX_ACCURACY_DROP,
+        }
+    return reports
+
+
+if __name__ == "__main__":
+    # python compactEmbeddings.py [model set] [--export [precision]]
+    args = sys.argv[1:]
+    export_precisions = []
+    if "--export" in args:
+        i = args.index("--export")
+        if i + 1 < len(args) and args[i + 1] in COMPACT_PRECISIONS:
+            export_precisions = [args.pop(i + 1)]
+        else:
+            export_precisions = list(COMPACT_PRECISIONS)
+        args.pop(i)
+    model_set = args[0] if args else "fulltext"
+    scorer = load_scorer(model_set, REGISTRY_DIR)
+    corpora = validation_corpora()
+    n_bills = sum(len(corpus) for _, corpus in corpora)
+
+    reports = evaluate(scorer, corpora)
+    print(f"{model_set}: {n_bills} validation bills, {reports['float32']['bills_scored']} with text to score, "
+          f"window {WINDOW}")
+    for precision, report in reports.items():
+        print(f"{precision:>8}: {report['megabytes']:.1f} MB, accuracy {report['accuracy']:.4f}, "
+              f"predicted class changed {report['class_change_rate']:.2%}, "
+              f"doc_probs abs diff max {report['max_abs_doc_prob_diff']:.4g} "
+              f"mean {report['mean_abs_doc_prob_diff']:.4g}, {'ok' if report['passed'] else 'FAILED'}")
+
+    for precision in export_precisions:
+        if reports[precision]["passed"]:
+            print(f"Exported {precision} scorer to {export_compact_scorer(model_set, precision)}")
+        else:
+            print(f"Not exporting {precision}: it failed the guardrails")
+    if not all(report["passed"] for report in reports.values()):
+        sys.exit(1)
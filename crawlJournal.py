@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+JOURNAL_PATH = "collected_bills_data.jsonl"
+TAIL_BYTES = 1 << 16
+
+
+def _json_default(value):
+    # Bill ids read with pandas arrive as numpy integers
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def drop_partial_line(path):
+    """
+    Cut off a last line left half-written by a crash, so appending resumes on a clean row.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - TAIL_BYTES)
+            f.seek(start)
+            block = f.read(position - start)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                if start + newline + 1 != end:
+                    f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+class CrawlJournal:
+    """
+    Append-only JSONL log of collected bill records.
+
+    Each record is written as one line the moment it is collected, so a checkpoint
+    costs one append regardless of how much has been crawled, and a restarted crawl
+    skips every bill id already in the file. compact() turns the journal into the
+    collected_bills_data workbook at the end.
+    """
+
+    def __init__(self, path=JOURNAL_PATH, sync=True):
+        self.path = path
+        self.sync = sync
+        self.lock = threading.Lock()
+        self.completed_ids = set()
+
+        # A record cut short by a crash would otherwise swallow the next append
+        drop_partial_line(self.path)
+        for record in self.records():
+            self.completed_ids.add(record["bill_id"])
+
+    def __contains__(self, bill_id):
+        return int(bill_id) in self.completed_ids
+
+    def __len__(self):
+        return len(self.completed_ids)
+
+    def pending(self, bill_ids):
+        """
+        The bill ids that are not in the journal yet, in their original order.
+        """
+        return [bill_id for bill_id in bill_ids if bill_id not in self]
+
+    def append(self, record):
+        """
+        Write one record to the end of the journal and flush it to disk.
+        """
+        line = json.dumps(record, default=_json_default)
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                if self.sync:
+                    os.fsync(f.fileno())
+            self.completed_ids.add(int(record["bill_id"]))
+
+    def records(self):
+        """
+        All records in the journal, keeping the latest one for a bill id that was written twice.
+        A partially written last line from a crash is ignored (and cut off when the journal is opened).
+        """
+        if not os.path.exists(self.path):
+            return []
+        by_id = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"Skipping unreadable journal line in {self.path}")
+                    continue
+                by_id[record["bill_id"]] = record
+        return list(by_id.values())
+
+    def compact(self, output_excel="collected_bills_data.xlsx"):
+        """
+        Write every journalled record, sorted by bill id, to the final workbook.
+        """
+        df_bills = pd.DataFrame(sorted(self.records(), key=lambda record: record["bill_id"]))
+        df_bills.to_excel(output_excel, index=False)
+        return df_bills
@@ -0,0 +1,118 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from tabularFeatures import parse_doc_prob
+
+FEATURE_STORE_DIR = "featureStore"
+# The tables handed between the modelling stages, each formerly an .xlsx of the same name
+TABLES = [
+    "data_with_status_doc_prob",
+    "merged_probabilities",
+    "merged_probabilities_training",
+    "validation_probabilities_training",
+    "merged_probabilities_training_with_status",
+    "validation_probabilities_training_with_status",
+]
+# Columns holding one score per category, stored as a list of floats rather than its printed numpy array
+ARRAY_COLUMNS = ("doc_prob", "doc_probs")
+PARQUET_ENGINE = "pyarrow"
+
+
+def table_path(name, store_dir=FEATURE_STORE_DIR):
+    return os.path.join(store_dir, f"{name}.parquet")
+
+
+def legacy_path(name):
+    return f"{name}.xlsx"
+
+
+def typed_columns(df):
+    """
+    Copy of df with columns Parquet can store typed: the printed doc_prob arrays become
+    lists of floats, and object columns mixing types become strings.
+    """
+    df = df.copy()
+    for column in df.columns:
+        values = df[column]
+        if column in ARRAY_COLUMNS:
+            # Missing scores stay null rather than becoming empty lists
+            df[column] = [parse_doc_prob(v) if isinstance(v, str) or hasattr(v, "__len__") else None
+                          for v in values]
+        elif values.dtype == object and pd.api.types.infer_dtype(values, skipna=True).startswith("mixed"):
+            df[column] = values.map(lambda v: v if pd.isnull(v) else str(v))
+    return df
+
+
+def excel_columns(df):
+    """
+    Copy of df with the list columns printed back the way the workbooks held them.
+    """
+    df = df.copy()
+    for column in df.columns.intersection(ARRAY_COLUMNS):
+        df[column] = [str(np.asarray(v)) if hasattr(v, "__len__") else v for v in df[column]]
+    return df
+
+
+def write_table(df, name, store_dir=FEATURE_STORE_DIR, excel=False):
+    """
+    Save df as the named table, replacing the previous version atomically. With excel,
+    also write it to {name}.xlsx for opening by hand. Returns the table path.
+    """
+    path = table_path(name, store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    typed_columns(df).to_parquet(tmp_path, engine=PARQUET_ENGINE, index=False)
+    os.replace(tmp_path, path)
+    if excel:
+        export_excel(name, store_dir)
+    return path
+
+
+def read_table(name, columns=None, store_dir=FEATURE_STORE_DIR, filters=None):
+    """
+    Load the named table, only the given columns and the rows matching filters if given.
+    A table not in the store yet is imported from its legacy workbook first.
+    """
+    path = table_path(name, store_dir)
+    if not os.path.exists(path):
+        import_excel(name, store_dir)
+    return pd.read_parquet(path, engine=PARQUET_ENGINE, columns=columns, filters=filters)
+
+
+def import_excel(name, store_dir=FEATURE_STORE_DIR):
+    """
+    Copy the legacy {name}.xlsx into the store. Returns the table path.
+    """
+    source = legacy_path(name)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"{name} is neither in {store_dir} nor in {source}")
+    start = time.perf_counter()
+    path = write_table(pd.read_excel(source), name, store_dir)
+    print(f"Imported {source} -> {path} in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def export_excel(name, store_dir=FEATURE_STORE_DIR, path=None):
+    """
+    Write the named table to an .xlsx workbook, by default {name}.xlsx. Returns its path.
+    """
+    path = path or legacy_path(name)
+    excel_columns(read_table(name, store_dir=store_dir)).to_excel(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    # python featureStore.py [--export-excel] [tables]
+    # Imports the legacy workbooks into the store, or with --export-excel writes the tables back out
+    names = [arg for arg in sys.argv[1:] if not arg.startswith("--")] or TABLES
+    for name in names:
+        if "--export-excel" in sys.argv:
+            print(f"{name} -> {export_excel(name)}")
+        elif os.path.exists(legacy_path(name)):
+            import_excel(name)
+        else:
+            print(f"{legacy_path(name)} not found, skipping")
@@ -0,0 +1,14 @@
+import hashlib
+
+CHUNK_SIZE = 1 << 16
+
+
+def file_sha256(path):
+    """
+    Hex SHA-256 of a file's contents, read in chunks so large files are never held in memory whole.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,7 +1,11 @@
+import sys
+
 import pandas as pd
 
-# 1. Load the merged probabilities file
-df_merged = pd.read_excel("merged_probabilities.xlsx")
+from featureStore import read_table, write_table
+
+# 1. Load the merged probabilities table
+df_merged = read_table("merged_probabilities")
 
 # 2. Define the file paths with corresponding split types
 files_info = [
@@ -41,8 +45,9 @@ df_validation = df_merged_full[df_merged_full['split'] == 'validation'].copy()
 df_training.drop(columns=['split'], inplace=True)
 df_validation.drop(columns=['split'], inplace=True)
 
-# 6. Save the resulting dataframes to Excel files
-df_training.to_excel("merged_probabilities_training.xlsx", index=False)
-df_validation.to_excel("validation_probabilities_training.xlsx", index=False)
+# 6. Save the resulting dataframes to the feature store (--excel also writes them as .xlsx)
+export_excel = "--excel" in sys.argv
+training_path = write_table(df_training, "merged_probabilities_training", excel=export_excel)
+validation_path = write_table(df_validation, "validation_probabilities_training", excel=export_excel)
 
-print("Files created: merged_probabilities_training.xlsx and validation_probabilities_training.xlsx")
+print(f"Tables created: {training_path} and {validation_path}")
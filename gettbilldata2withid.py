@@ -1,82 +1,32 @@
-import requests
 import urllib.parse
 from datetime import datetime
 
-API_BASE_URL = "https://bills-api.parliament.uk/api/v1/Bills"
+from billRecord import get_json, fetch_bill_record, progress_status, first_sponsor_party, current_stage_date
 
 def get_bill_info(bill_id):
     """
     Retrieve bill details and its progress for the given bill id.
     Uses the first stage sitting date from current stage as the introduced date.
+    The bill JSON is fetched once and the status and sponsor party are read from it.
     """
-    url = f"{API_BASE_URL}/{bill_id}"
-    headers = {"accept": "application/json"}
-    response = requests.get(url, headers=headers)
-    
     try:
-        data = response.json()
-        if isinstance(data, dict):
-            long_title = data.get("longTitle", "N/A")
-            short_title = data.get("shortTitle", "N/A")
-            orig_house = data.get("originatingHouse", "N/A")
-            progress_status = check_bill_progress(bill_id)
-            sessionID = data.get("introducedSessionId", "N/A")
-            
-            # Extract the introduced date from the first stage sitting in currentStage
-            introduced_date = None
-            current_stage = data.get("currentStage", None)
-            if current_stage:
-                stage_sitting = current_stage.get("stageSitting", None)
-                if stage_sitting and isinstance(stage_sitting, list) and len(stage_sitting) > 0:
-                    introduced_date = stage_sitting[0].get("date", None)
-            
+        record = fetch_bill_record(bill_id, include_stages=False)
+        if record is not None:
+            data = record["bill"]
             return {
                 "bill_id": bill_id,
-                "long_title": long_title,
-                "short_title": short_title,
-                "originating_house": orig_house,
-                "progress_status": progress_status,
-                "sessionID": sessionID,
-                "introduced_date": introduced_date
+                "long_title": data.get("longTitle", "N/A"),
+                "short_title": data.get("shortTitle", "N/A"),
+                "originating_house": data.get("originatingHouse", "N/A"),
+                "progress_status": progress_status(data),
+                "sessionID": data.get("introducedSessionId", "N/A"),
+                "introduced_date": current_stage_date(data),
+                "sponsor_party": first_sponsor_party(data)
             }
     except Exception as e:
         print(f"Error processing bill id {bill_id}: {e}")
     return None
 
-def check_bill_progress(bill_id):
-    url = f"{API_BASE_URL}/{bill_id}"
-    headers = {"accept": "application/json"}
-    
-    response = requests.get(url, headers=headers)
-    try:
-        data = response.json()
-        if 'isAct' in data:
-            return 2 if data['isAct'] else 1
-        else:
-            return 3  
-    except Exception as e:
-        print(f"Error checking progress for bill id {bill_id}: {e}")
-        return None
-
-def get_first_sponsor_party(bill_id):
-    """
-    Retrieve the party of the first sponsor of the given bill.
-    """
-    url = f"{API_BASE_URL}/{bill_id}"
-    headers = {"accept": "application/json"}
-    response = requests.get(url, headers=headers)
-    
-    try:
-        data = response.json()
-        sponsors = data.get("sponsors", [])
-        if sponsors:
-            return sponsors[0].get("member", {}).get("party", "N/A")
-        else:
-            return "N/A"
-    except Exception as e:
-        print(f"Error retrieving sponsor info for bill id {bill_id}: {e}")
-        return "N/A"
-
 def format_date_for_api(date_str):
     """
     Convert an ISO date string (e.g., "2007-10-27T16:26:00") to the format YYYY-MM-DD.
@@ -106,11 +56,9 @@ def get_commons_seat_counts(for_date):
     base_url = "https://members-api.parliament.uk/api/Parties/StateOfTheParties"
     encoded_date = urllib.parse.quote(for_date)
     url = f"{base_url}/commons/{encoded_date}"
-    headers = {"accept": "application/json"}
     
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        data = response.json()
+    data = get_json(url)
+    if data is not None:
         items = data.get("items", [])
         party_seat_counts = {}
         for item in items:
@@ -129,9 +77,6 @@ if __name__ == "__main__":
     info = get_bill_info(bill_id)
     
     if info is not None:
-        sponsor_party = get_first_sponsor_party(bill_id)
-        info["sponsor_party"] = sponsor_party
-        
         if info["introduced_date"]:
             formatted_date = format_date_for_api(info["introduced_date"])
             info["formatted_date"] = formatted_date
@@ -0,0 +1,177 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from billRecord import iter_bill_summaries, invalidate_bill_record
+from billCrawler import BillCrawler
+from crawlJournal import CrawlJournal
+from responseCache import OFFLINE
+
+SYNC_STATE_PATH = "sync_state.json"
+OUTPUT_EXCEL = "collected_bills_data.xlsx"
+# The bills of the four categories the dataset is built from
+CATEGORY_CSVS = [
+    "18_17 to 39.csv",
+    "19_17 to 39.csv",
+    "28_17 to 39.csv",
+    "29_17 to 39.csv"
+]
+
+
+def parse_last_update(value):
+    """
+    Parse a bills-api 'lastUpdate' timestamp (which may carry 7 fractional digits or a 'Z')
+    into a comparable datetime. Returns None when it cannot be parsed.
+    """
+    if not value:
+        return None
+    value = value.replace("Z", "")
+    if "." in value:
+        date_part, micro_part = value.split(".", 1)
+        micro_part = "".join(filter(str.isdigit, micro_part))[:6].ljust(6, "0")
+        value = f"{date_part}.{micro_part}"
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def load_sync_state(path=SYNC_STATE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_sync_state(state, path=SYNC_STATE_PATH):
+    # Write to a temporary file first so a crash cannot leave a truncated state file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def tracked_bills(files=CATEGORY_CSVS):
+    """
+    Bill ids and session ids listed in the category CSVs, the bills the dataset follows.
+    """
+    bill_ids, session_ids = set(), set()
+    for file in files:
+        df = pd.read_csv(file, usecols=["Bill Id", "SessionID"])
+        bill_ids.update(int(bill_id) for bill_id in df["Bill Id"].dropna())
+        session_ids.update(int(session_id) for session_id in df["SessionID"].dropna())
+    return bill_ids, session_ids
+
+
+def find_changed_bills(high_water_mark, tracked_ids=None, tracked_sessions=None):
+    """
+    Page the Bills list newest-update-first and return the ids of every tracked bill updated
+    after high_water_mark, along with the newest 'lastUpdate' seen.
+    A bill is tracked if its id is in tracked_ids or it was introduced in one of
+    tracked_sessions; with neither given every bill is. The mark advances past untracked
+    bills too, so they are not looked at again.
+    Paging stops at the first bill older than the mark, so a quiet day costs one request.
+    A failed page raises RequestFailed so the mark is never advanced past unseen bills.
+    In offline mode the list pages come from the response cache like every other request.
+    """
+    since = parse_last_update(high_water_mark)
+    changed_ids = []
+    newest_raw, newest = high_water_mark, since
+    track_all = tracked_ids is None and tracked_sessions is None
+
+    for summary in iter_bill_summaries({"SortOrder": "DateUpdatedDescending"}, use_cache=OFFLINE):
+        raw = summary.get("lastUpdate")
+        last_update = parse_last_update(raw)
+        # Bills updated exactly at the mark are refetched, better twice than never
+        if since is not None and last_update is not None and last_update < since:
+            break
+        if (track_all or summary["billId"] in (tracked_ids or ())
+                or summary.get("introducedSessionId") in (tracked_sessions or ())):
+            changed_ids.append(summary["billId"])
+        if last_update is not None and (newest is None or last_update > newest):
+            newest_raw, newest = raw, last_update
+
+    return changed_ids, newest_raw
+
+
+def merge_into_workbook(records, path=OUTPUT_EXCEL):
+    """
+    Replace (or add) the rows of the given bills in the collected workbook, keeping it sorted by bill id.
+    """
+    df_new = pd.DataFrame(records)
+    if os.path.exists(path):
+        df_existing = pd.read_excel(path)
+        df_existing = df_existing[~df_existing["bill_id"].isin(df_new["bill_id"])]
+        df_merged = pd.concat([df_existing, df_new], ignore_index=True)
+    else:
+        df_merged = df_new
+    df_merged = df_merged.sort_values("bill_id").reset_index(drop=True)
+    df_merged.to_excel(path, index=False)
+    return df_merged
+
+
+def sync(state_path=SYNC_STATE_PATH, output_excel=OUTPUT_EXCEL, category_csvs=CATEGORY_CSVS):
+    """
+    Fetch details only for the tracked bills (those in the category CSVs, plus new bills
+    of their sessions) that are new or changed since the previous sync, and merge them
+    into the collected dataset and the crawl journal. Does nothing in offline mode,
+    where the changes cannot be seen.
+    """
+    if OFFLINE:
+        print("Offline mode (PLUM_OFFLINE): skipping the sync.")
+        return []
+    state = load_sync_state(state_path)
+    high_water_mark = state.get("high_water_mark")
+
+    if high_water_mark is None:
+        # First run: the dataset comes from a full crawl, so just remember where the API is now
+        first = next(iter(iter_bill_summaries({"SortOrder": "DateUpdatedDescending"}, take=1, use_cache=False)), None)
+        if first is None:
+            print("The Bills list is empty; nothing recorded.")
+            return []
+        state["high_water_mark"] = first.get("lastUpdate")
+        state["last_run"] = datetime.now(timezone.utc).isoformat()
+        save_sync_state(state, state_path)
+        print(f"No previous sync found; high-water mark set to {state['high_water_mark']}.")
+        return []
+
+    tracked_ids, tracked_sessions = tracked_bills(category_csvs)
+    changed_ids, newest = find_changed_bills(high_water_mark, tracked_ids, tracked_sessions)
+    print(f"{len(changed_ids)} bills changed since {high_water_mark}.")
+    # Bills that failed last time are below the mark now, so carry them over explicitly
+    pending_ids = state.get("pending_ids", [])
+    bill_ids = list(dict.fromkeys(changed_ids + pending_ids))
+    if not bill_ids:
+        # Only untracked bills changed: still move the mark past them so they are not paged again
+        state["high_water_mark"] = newest
+        state["last_run"] = datetime.now(timezone.utc).isoformat()
+        save_sync_state(state, state_path)
+        print(f"Nothing to crawl; high-water mark is now {newest}.")
+        return []
+
+    for bill_id in bill_ids:
+        invalidate_bill_record(bill_id)
+    crawler = BillCrawler()
+    records = crawler.crawl(bill_ids)
+
+    journal = CrawlJournal()
+    for record in records:
+        journal.append(record)
+    if records:
+        merge_into_workbook(records, output_excel)
+
+    # Only move the mark forward once the changes are safely stored
+    state["high_water_mark"] = newest
+    state["pending_ids"] = crawler.failed_ids
+    state["last_run"] = datetime.now(timezone.utc).isoformat()
+    save_sync_state(state, state_path)
+    print(f"Merged {len(records)} bills into {output_excel}; high-water mark is now {newest}.")
+    if crawler.failed_ids:
+        print(f"{len(crawler.failed_ids)} bills failed and will be retried next sync: {crawler.failed_ids}")
+    return records
+
+
+if __name__ == "__main__":
+    sync()
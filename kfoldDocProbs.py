@@ -0,0 +1,140 @@
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from streamingCorpus import StreamingCorpus
+from tokenCorpus import TokenCorpus, corpus_dir_for, dataframe_corpus
+from w2vScoring import CATEGORIES, MultiModelScorer, classify_document
+from w2vTraining import (DEFAULT_SESSIONS, EPOCHS, SHUFFLE_SEED, W2V_PARAMS, build_vocab_template,
+                         train_category)
+
+KFOLD_DIR = "kfoldDocProbs"
+N_FOLDS = 5
+FOLD_SEED = 0
+TRAINING_BASE = "cleanedTexWithID"
+OUTPUT_PATH = os.path.join(KFOLD_DIR, "out_of_fold_doc_probs.csv")
+
+
+def fold_of(bill_id, n_folds=N_FOLDS, seed=FOLD_SEED):
+    """
+    Fold of a bill, from a hash of its id: stable across runs and when bills are added.
+    """
+    digest = hashlib.sha256(f"{seed}:{bill_id}".encode("utf-8")).hexdigest()
+    return int(digest, 16) % n_folds
+
+
+def load_training_bills(categories=CATEGORIES, base=TRAINING_BASE, text_column='extracted_text'):
+    """
+    {category: (bill ids, TokenCorpus)} of every category's training CSV, tokenized once.
+    """
+    bills = {}
+    for key, code in categories.items():
+        path = os.path.join(base, str(code), "Training", f"training_text{code}.csv")
+        df = pd.read_csv(path, on_bad_lines='skip')
+        print(f"{path}: {len(df)} bills")
+        bills[key] = (df['id'].tolist(), dataframe_corpus(df, text_column, corpus_dir_for(path)))
+    return bills
+
+
+def _build_fold_vocab(task):
+    fold, corpus_dirs, documents, path, params, threads = task
+    build_vocab_template(StreamingCorpus(corpus_dirs, documents=documents), path, params, workers=threads)
+    return fold, path
+
+
+def _score_fold(task):
+    """
+    Score the held-out bills of one fold with the four models trained without them.
+    """
+    from gensim.models import Word2Vec
+
+    fold, model_paths, held_out, window = task
+    scorer = MultiModelScorer({key: Word2Vec.load(path).wv for key, path in model_paths.items()}, window)
+    rows = []
+    for key, corpus_dir, documents, ids in held_out:
+        corpus = TokenCorpus(corpus_dir)
+        for i, bill_id in zip(documents, ids):
+            sentence_scores = scorer.score_corpus_document(corpus, int(i), window)
+            if not len(sentence_scores):
+                # No text or no scoreable sentence: no prediction rather than one picked from NaNs
+                rows.append((bill_id, key, fold, None, None))
+                continue
+            predicted_idx, doc_probs = classify_document(sentence_scores)
+            rows.append((bill_id, key, fold, scorer.categories[predicted_idx], str(doc_probs)))
+    return rows
+
+
+def out_of_fold_doc_probs(n_folds=N_FOLDS, categories=CATEGORIES, epochs=EPOCHS, params=W2V_PARAMS, window=7,
+                          processes=None, kfold_dir=KFOLD_DIR, output_path=OUTPUT_PATH):
+    """
+    Leakage-free doc_probs for every training bill.
+
+    Each category's bills are split into n_folds folds by id. For every fold the shared
+    vocabulary is built from the other folds, the four category models are trained on
+    the other folds' bills of their category, and the fold's bills are scored with them,
+    so no bill is scored by a model that saw it. A bill with nothing to score gets an
+    empty predicted_class and doc_probs. The vocabularies, the n_folds x 4 models
+    and the scoring all run across one pool of worker processes. Writes one table with
+    id, category, fold, predicted_class and doc_probs to output_path and returns it.
+    """
+    start = time.perf_counter()
+    bills = load_training_bills(categories)
+    folds = {key: np.array([fold_of(bill_id, n_folds) for bill_id in ids]) for key, (ids, _) in bills.items()}
+    keys = list(categories)
+    corpus_dirs = [bills[key][1].corpus_dir for key in keys]
+
+    def training_docs(key, fold):
+        return np.nonzero(folds[key] != fold)[0]
+
+    def model_path(fold, key):
+        return os.path.join(kfold_dir, f"fold{fold}", f"{key}.model")
+
+    # The cores are split between the tasks running side by side in each phase
+    processes = processes or os.cpu_count() or 1
+    n_models = n_folds * len(keys)
+    vocab_threads = max(1, (os.cpu_count() or 1) // min(processes, n_folds))
+    threads = max(1, (os.cpu_count() or 1) // min(processes, n_models))
+
+    vocab_tasks = [(fold, corpus_dirs, [training_docs(key, fold) for key in keys],
+                    os.path.join(kfold_dir, f"fold{fold}", "shared_vocab.model"), params, vocab_threads)
+                   for fold in range(n_folds)]
+
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as executor:
+        templates = dict(executor.map(_build_fold_vocab, vocab_tasks))
+        print(f"Built {n_folds} fold vocabularies in {time.perf_counter() - start:.1f}s")
+
+        train_tasks = [(key, templates[fold],
+                        StreamingCorpus(bills[key][1].corpus_dir, seed=SHUFFLE_SEED,
+                                        documents=[training_docs(key, fold)]),
+                        model_path(fold, key), epochs, threads, False, DEFAULT_SESSIONS)
+                       for fold in range(n_folds) for key in keys]
+        for key, path, seconds in executor.map(train_category, train_tasks):
+            print(f"{path}: trained in {seconds:.1f}s")
+        print(f"Trained {n_models} models in {time.perf_counter() - start:.1f}s")
+
+        score_tasks = []
+        for fold in range(n_folds):
+            held_out = []
+            for key in keys:
+                documents = np.nonzero(folds[key] == fold)[0]
+                ids = [bills[key][0][i] for i in documents]
+                held_out.append((key, bills[key][1].corpus_dir, documents, ids))
+            score_tasks.append((fold, {key: model_path(fold, key) for key in keys}, held_out, window))
+        rows = [row for fold_rows in executor.map(_score_fold, score_tasks) for row in fold_rows]
+
+    table = pd.DataFrame(rows, columns=['id', 'category', 'fold', 'predicted_class', 'doc_probs'])
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    table.to_csv(output_path, index=False)
+    print(f"{len(table)} out-of-fold doc_probs in {time.perf_counter() - start:.1f}s -> {output_path}")
+    return table
+
+
+if __name__ == "__main__":
+    # python kfoldDocProbs.py [K]
+    out_of_fold_doc_probs(int(sys.argv[1]) if len(sys.argv) > 1 else N_FOLDS)
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+from w2vScoring import MODEL_PATHS, TITLE_MODEL_PATHS, MultiModelScorer
+from w2vTraining import sessions_seen
+
+REGISTRY_DIR = "modelRegistry"
+MANIFEST_NAME = "manifest.json"
+# Model sets the registry knows how to export, by the paths the training notebooks save to
+MODEL_SETS = {"fulltext": MODEL_PATHS, "titles": TITLE_MODEL_PATHS}
+
+
+def vectors_fingerprint(wv):
+    digest = hashlib.sha256("\0".join(wv.index_to_key).encode("utf-8"))
+    digest.update(np.ascontiguousarray(wv.vectors).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def read_manifest(registry_dir=REGISTRY_DIR):
+    path = os.path.join(registry_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"sets": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(manifest, registry_dir=REGISTRY_DIR):
+    os.makedirs(registry_dir, exist_ok=True)
+    path = os.path.join(registry_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def scoring_vectors(model):
+    """
+    A copy of a model's word vectors as plain KeyedVectors, without the training-only
+    state (hs output layer, counts, locks) a full Word2Vec model carries.
+    """
+    from gensim.models import KeyedVectors
+
+    wv = getattr(model, "wv", model)
+    kv = KeyedVectors(wv.vector_size, dtype=np.float32)
+    kv.add_vectors(wv.index_to_key, wv.vectors.astype(np.float32, copy=False))
+    return kv
+
+
+def export_models(models, model_set, registry_dir=REGISTRY_DIR, sources=None, window=7):
+    """
+    Export {category: model} into the registry under model_set and record it in the manifest.
+
+    Each category's vectors are saved as KeyedVectors with the vector array in its own
+    .npy file so it can be memory-mapped, and the stacked MultiModelScorer arrays are
+    saved next to them. Files are named by the vectors' fingerprint, so a retrained
+    model never overwrites files another process has mapped.
+    Returns the manifest entry of the set.
+    """
+    set_dir = os.path.join(registry_dir, model_set)
+    os.makedirs(set_dir, exist_ok=True)
+    sources = sources or {}
+
+    entry = {"categories": {}, "window": window}
+    fingerprints = []
+    for category, model in models.items():
+        kv = scoring_vectors(model)
+        fingerprint = vectors_fingerprint(kv)
+        fingerprints.append(fingerprint)
+        file_name = f"{category}_{fingerprint}.kv"
+        path = os.path.join(set_dir, file_name)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            kv.save(tmp_path, separately=["vectors"])
+            os.replace(f"{tmp_path}.vectors.npy", f"{path}.vectors.npy")
+            os.replace(tmp_path, path)
+        entry["categories"][category] = {
+            "file": os.path.join(model_set, file_name),
+            "source": sources.get(category),
+            "fingerprint": fingerprint,
+            "words": len(kv.index_to_key),
+            "vector_size": kv.vector_size,
+            "sessions": sessions_seen(model),
+        }
+
+    scorer_name = "scorer_" + hashlib.sha256(f"{window}:{':'.join(fingerprints)}".encode("utf-8")).hexdigest()[:16]
+    scorer_dir = os.path.join(set_dir, scorer_name)
+    if not os.path.exists(os.path.join(scorer_dir, "meta.json")):
+        shutil.rmtree(scorer_dir, ignore_errors=True)
+        MultiModelScorer(models, window).save(scorer_dir)
+    entry["scorer"] = os.path.join(model_set, scorer_name)
+
+    # Re-read so concurrent exports of other sets are not lost
+    manifest = read_manifest(registry_dir)
+    manifest["sets"][model_set] = entry
+    write_manifest(manifest, registry_dir)
+    return entry
+
+
+def export_model_files(model_set, model_paths=None, registry_dir=REGISTRY_DIR, window=7):
+    """
+    Load the full Word2Vec models of a set from disk once and export them.
+    """
+    from gensim.models import Word2Vec
+
+    model_paths = model_paths or MODEL_SETS[model_set]
+    models = {category: Word2Vec.load(path) for category, path in model_paths.items()}
+    return export_models(models, model_set, registry_dir, sources=model_paths, window=window)
+
+
+def _set_entry(model_set, registry_dir):
+    manifest = read_manifest(registry_dir)
+    if model_set not in manifest["sets"]:
+        raise KeyError(f"Model set '{model_set}' is not in {os.path.join(registry_dir, MANIFEST_NAME)}; "
+                       f"export it first with python modelRegistry.py {model_set}")
+    return manifest["sets"][model_set]
+
+
+def load_models(model_set="fulltext", registry_dir=REGISTRY_DIR, mmap="r"):
+    """
+    {category: KeyedVectors} of a registered set, in the manifest's category order.
+    The vectors are memory-mapped read-only, so loading is near-instant and all
+    processes on the host share one physical copy through the page cache.
+    """
+    from gensim.models import KeyedVectors
+
+    entry = _set_entry(model_set, registry_dir)
+    return {category: KeyedVectors.load(os.path.join(registry_dir, artifact["file"]), mmap=mmap)
+            for category, artifact in entry["categories"].items()}
+
+
+def export_compact_scorer(model_set, precision, registry_dir=REGISTRY_DIR):
+    """
+    Save the set's stacked scorer in a reduced precision ("float16" or "int8") next to
+    the float32 one and record it in the manifest. Returns its directory.
+    """
+    entry = _set_entry(model_set, registry_dir)
+    name = f"{entry['scorer']}_{precision}"
+    scorer_dir = os.path.join(registry_dir, name)
+    if not os.path.exists(os.path.join(scorer_dir, "meta.json")):
+        shutil.rmtree(scorer_dir, ignore_errors=True)
+        load_scorer(model_set, registry_dir).with_precision(precision).save(scorer_dir)
+
+    manifest = read_manifest(registry_dir)
+    manifest["sets"][model_set].setdefault("compact_scorers", {})[precision] = name
+    write_manifest(manifest, registry_dir)
+    return scorer_dir
+
+
+def load_scorer(model_set="fulltext", registry_dir=REGISTRY_DIR, precision="float32"):
+    """
+    The stacked MultiModelScorer of a registered set, opened with mmap, in float32 or
+    in a compact precision exported with export_compact_scorer.
+    """
+    entry = _set_entry(model_set, registry_dir)
+    if precision == "float32":
+        return MultiModelScorer.load(os.path.join(registry_dir, entry["scorer"]))
+    compact = entry.get("compact_scorers", {})
+    if precision not in compact:
+        raise KeyError(f"No {precision} scorer for model set '{model_set}'; "
+                       f"export it first with python compactEmbeddings.py {model_set} --export {precision}")
+    return MultiModelScorer.load(os.path.join(registry_dir, compact[precision]))
+
+
+if __name__ == "__main__":
+    for model_set in sys.argv[1:] or list(MODEL_SETS):
+        missing = [path for path in MODEL_SETS[model_set].values() if not os.path.exists(path)]
+        if missing:
+            print(f"{model_set}: skipping, missing {missing}")
+            continue
+        entry = export_model_files(model_set)
+        for category, artifact in entry["categories"].items():
+            print(f"{model_set}/{category}: {artifact['words']} words -> {artifact['file']}")
+        print(f"{model_set}: scorer -> {entry['scorer']}")
@@ -0,0 +1,157 @@
+import hashlib
+import os
+
+import numpy as np
+from scipy.special import expit as sigmoid
+
+PAIR_CACHE_DIR = "pairScoreCache"
+# gensim sorts the vocabulary by frequency, so the first words cover most pairs in bill text
+DEFAULT_TOP_N = 4000
+# Words whose row of scores against the top words is kept in memory. Off by default: with
+# the table covering the frequent words, recomputing the remaining pairs measured faster
+DEFAULT_LRU_SIZE = 0
+# A row costs top_n dot products, so only words already seen in this many batches get one
+ADMIT_AFTER = 4
+
+
+def pair_log_probs(vectors_i, vectors_j):
+    """
+    log(sigmoid(v_i . v_j) + 1e-10) for aligned rows of two vector arrays, as in score_sentence.
+    """
+    dots = np.einsum("nd,nd->n", vectors_i, vectors_j)
+    return np.log(sigmoid(dots).astype(np.float64) + 1e-10)
+
+
+def table_path_for(wv, top_n, cache_dir=PAIR_CACHE_DIR):
+    # Keyed by the vectors themselves, so a retrained model never reads a stale table
+    fingerprint = hashlib.sha256(np.ascontiguousarray(wv.vectors[:top_n]).tobytes()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"pairs_{top_n}_{fingerprint}.npy")
+
+
+def load_or_build_table(wv, top_n, cache_dir=PAIR_CACHE_DIR):
+    """
+    The top_n x top_n table of pair log-probabilities of the most frequent words,
+    built once per set of vectors and opened with mmap afterwards.
+    """
+    path = table_path_for(wv, top_n, cache_dir)
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        vectors = wv.vectors[:top_n]
+        table = np.log(sigmoid(vectors @ vectors.T).astype(np.float64) + 1e-10).astype(np.float32)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, table)
+        os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r")
+
+
+class PairScoreCache:
+    """
+    Cache of pair log-probabilities for one model.
+
+    Pairs of two words among the top_n most frequent are read from a precomputed
+    table stored in pairScoreCache/ and memory-mapped, so repeated scoring runs
+    mostly turn into table lookups. A pair of a frequent word with a less frequent
+    one is read from that word's row of scores against the top_n words. Those rows
+    are computed on demand and kept in an LRU of up to lru_size words; a word's row
+    is only cached once the word has turned up in ADMIT_AFTER earlier batches (calls
+    to log_probs), so occasional words do not pay for a whole row. Pairs of two less
+    frequent words are computed directly.
+
+    table_hits, lru_hits and misses count, per pair, where each score came from: the
+    table, a cached row (including one computed for the current batch), or a direct
+    computation.
+    """
+
+    def __init__(self, model, top_n=DEFAULT_TOP_N, lru_size=DEFAULT_LRU_SIZE, cache_dir=PAIR_CACHE_DIR):
+        self.wv = getattr(model, "wv", model)
+        self.top_n = min(top_n, len(self.wv.index_to_key))
+        self.table = load_or_build_table(self.wv, self.top_n, cache_dir)
+
+        vocab_size = len(self.wv.index_to_key)
+        self.lru_size = lru_size
+        # The LRU is kept in arrays so a whole batch of words is handled at once:
+        # slot_of maps a word to its row in row_cache, last_used orders the slots
+        self.slot_of = np.full(vocab_size, -1, dtype=np.int64)
+        self.word_in_slot = np.full(lru_size, -1, dtype=np.int64)
+        self.last_used = np.zeros(lru_size, dtype=np.int64)
+        self.row_cache = np.empty((lru_size, self.top_n), dtype=np.float32)
+        self.slots_used = 0
+        self.tick = 0
+        self.seen = np.zeros(vocab_size, dtype=np.uint8)
+
+        self.table_hits = 0
+        self.lru_hits = 0
+        self.misses = 0
+
+    def _cache_rows(self, words):
+        """
+        Mark the unique words of a batch as used and compute rows for new words seen before.
+        """
+        self.tick += 1
+        cached = self.slot_of[words] >= 0
+        self.last_used[self.slot_of[words[cached]]] = self.tick
+
+        new_words = words[~cached & (self.seen[words] >= ADMIT_AFTER)]
+        self.seen[words] = np.minimum(self.seen[words], ADMIT_AFTER) + 1
+        # Never evict a row that is needed for the current batch
+        new_words = new_words[:max(self.lru_size - int(cached.sum()), 0)]
+        if not len(new_words):
+            return
+
+        free = min(len(new_words), self.lru_size - self.slots_used)
+        slots = np.arange(self.slots_used, self.slots_used + free)
+        self.slots_used += free
+        self.last_used[slots] = self.tick
+        evict = len(new_words) - free
+        if evict:
+            # Only slots untouched by this batch can be the least recently used
+            victims = np.argpartition(self.last_used, evict - 1)[:evict]
+            self.slot_of[self.word_in_slot[victims]] = -1
+            slots = np.concatenate([slots, victims])
+
+        self.word_in_slot[slots] = new_words
+        self.slot_of[new_words] = slots
+        self.last_used[slots] = self.tick
+        rows = self.wv.vectors[new_words] @ self.wv.vectors[:self.top_n].T
+        self.row_cache[slots] = np.log(sigmoid(rows).astype(np.float64) + 1e-10)
+
+    def log_probs(self, rows_i, rows_j):
+        """
+        Pair log-probabilities for aligned arrays of model row indices.
+        """
+        out = np.empty(len(rows_i))
+        frequent_i = rows_i < self.top_n
+        frequent_j = rows_j < self.top_n
+
+        both = frequent_i & frequent_j
+        out[both] = self.table[rows_i[both], rows_j[both]]
+        self.table_hits += int(both.sum())
+
+        mixed = np.nonzero(frequent_i ^ frequent_j)[0]
+        rare = np.where(frequent_i[mixed], rows_j[mixed], rows_i[mixed])
+        frequent = np.where(frequent_i[mixed], rows_i[mixed], rows_j[mixed])
+        if len(rare) and self.lru_size:
+            self._cache_rows(np.unique(rare))
+        slots = self.slot_of[rare]
+        cached = slots >= 0
+        out[mixed[cached]] = self.row_cache[slots[cached], frequent[cached]]
+        self.lru_hits += int(cached.sum())
+
+        compute = np.concatenate([mixed[~cached], np.nonzero(~frequent_i & ~frequent_j)[0]])
+        if len(compute):
+            out[compute] = pair_log_probs(self.wv.vectors[rows_i[compute]], self.wv.vectors[rows_j[compute]])
+        self.misses += len(compute)
+        return out
+
+    def hit_rate(self):
+        total = self.table_hits + self.lru_hits + self.misses
+        return (self.table_hits + self.lru_hits) / total if total else 0.0
+
+    def stats(self):
+        return {
+            "table_hits": self.table_hits,
+            "lru_hits": self.lru_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+            "lru_words": self.slots_used,
+        }
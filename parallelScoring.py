@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from modelRegistry import REGISTRY_DIR, load_scorer
+from tokenCorpus import TokenCorpus, dataframe_corpus, corpus_dir_for
+from w2vScoring import classify_document
+
+DOCUMENTS_PER_TASK = 4
+# Each worker is one core; BLAS threads inside the workers would only fight over them
+_SINGLE_THREAD_ENV = {name: "1" for name in
+                      ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "VECLIB_MAXIMUM_THREADS")}
+
+_scorer = None
+_corpora = {}
+
+
+def _init_worker(model_set, registry_dir):
+    global _scorer
+    _scorer = load_scorer(model_set, registry_dir)
+
+
+def _score_range(task):
+    corpus_dir, start, stop, window = task
+    corpus = _corpora.get(corpus_dir)
+    if corpus is None:
+        corpus = _corpora[corpus_dir] = TokenCorpus(corpus_dir)
+    results = []
+    for i in range(start, stop):
+        sentence_scores = _scorer.score_corpus_document(corpus, i, window)
+        if not len(sentence_scores):
+            # No text or no scoreable sentence: no class rather than one picked from NaNs
+            results.append((None, None))
+            continue
+        predicted_idx, doc_probs = classify_document(sentence_scores)
+        results.append((int(predicted_idx), doc_probs))
+    return results
+
+
+def score_corpora(corpora, model_set="fulltext", window=7, workers=None, documents_per_task=DOCUMENTS_PER_TASK,
+                  registry_dir=REGISTRY_DIR):
+    """
+    Score every document of every corpus across a pool of worker processes.
+    Workers open the registered set's stacked scorer and the token corpora with mmap
+    instead of receiving copies, so they share one read-only copy of the vectors, and
+    all corpora share one pool so no core idles between files.
+    Returns {corpus_dir: [(predicted class index, doc_probs), ...]} in document order,
+    with (None, None) for a document that has no sentences to score.
+    """
+    tasks = [(corpus.corpus_dir, start, min(start + documents_per_task, len(corpus)), window)
+             for corpus in corpora
+             for start in range(0, len(corpus), documents_per_task)]
+    results = {corpus.corpus_dir: [] for corpus in corpora}
+
+    saved_env = {name: os.environ.get(name) for name in _SINGLE_THREAD_ENV}
+    os.environ.update(_SINGLE_THREAD_ENV)
+    try:
+        # spawn so the workers start clean and pick up the thread limits when they import numpy
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(model_set, registry_dir)) as executor:
+            for task, chunk in zip(tasks, executor.map(_score_range, tasks)):
+                results[task[0]].extend(chunk)
+    finally:
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    return results
+
+
+def score_csv_files(paths, model_set="fulltext", text_column='extracted_text', window=7, workers=None,
+                    registry_dir=REGISTRY_DIR):
+    """
+    Parallel appendScoresToFile over several CSVs with the models of a registered set:
+    adds predicted_class and doc_probs to each file, with rows in their original order.
+    Returns {path: DataFrame}.
+    """
+    categories = load_scorer(model_set, registry_dir).categories
+
+    frames = {}
+    corpora = {}
+    for path in paths:
+        df = pd.read_csv(path, on_bad_lines='skip')
+        print(f"Df {path} size {len(df)}")
+        frames[path] = df
+        corpora[path] = dataframe_corpus(df, text_column, corpus_dir_for(path))
+
+    results = score_corpora(list(corpora.values()), model_set, window, workers, registry_dir=registry_dir)
+
+    for path, df in frames.items():
+        scored = results[corpora[path].corpus_dir]
+        df['predicted_class'] = [categories[predicted_idx] if predicted_idx is not None else None
+                                 for predicted_idx, _ in scored]
+        df['doc_probs'] = pd.Series([doc_probs for _, doc_probs in scored], index=df.index, dtype=object)
+        df.to_csv(path, index=False)
+    return frames
@@ -0,0 +1,209 @@
+import ast
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from fileHash import file_sha256
+
+DOWNLOAD_BASE = "billTextDownload"
+MANIFEST_NAME = "download_manifest.json"
+CHUNK_SIZE = 1 << 16
+HEADERS = {
+    "accept": "application/pdf",
+    "user-agent": "Mozilla/5.0 (compatible; PLUM bill text downloader)",
+}
+
+
+def read_url_dictionary(path):
+    """
+    Read a '{code}_17 to 39 url dictionary.txt' file: one {'id': ..., 'url': ...} dict per line.
+    """
+    bill_list = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                bill_list.append(ast.literal_eval(line))
+    return bill_list
+
+
+def make_session(max_workers):
+    """
+    Pooled session that retries connection errors, 429 and 5xx with exponential backoff.
+    """
+    session = requests.Session()
+    retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=["GET"], respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class PdfDownloader:
+    """
+    Downloads bill PDFs straight over HTTP into one folder, several at a time.
+
+    Bodies are streamed to a .part file and renamed once complete. The ETag and
+    Last-Modified of every download are kept in download_manifest.json, so a
+    rerun sends conditional requests and skips PDFs that have not changed (304).
+    Files are checksummed as they stream; a PDF identical to one already in the
+    folder is stored as a hard link to it instead of a second copy.
+    """
+
+    def __init__(self, download_dir, max_workers=8, timeout=60):
+        self.download_dir = download_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = make_session(max_workers)
+        self.lock = threading.Lock()
+
+        os.makedirs(download_dir, exist_ok=True)
+        self.manifest_path = os.path.join(download_dir, MANIFEST_NAME)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self.by_checksum = {entry["sha256"]: entry["path"] for entry in self.manifest.values() if entry.get("sha256")}
+
+    def save_manifest(self):
+        with self.lock:
+            tmp_path = self.manifest_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=1)
+            os.replace(tmp_path, self.manifest_path)
+
+    def _forget_path(self, path, keep_bill_id):
+        """
+        Repoint or drop the checksums that resolve to path, whose content is about to be replaced.
+        Called with the lock held. Another bill's file with the same content takes over the
+        checksum; with none left it is dropped, so nothing is linked to the new bytes by mistake.
+        """
+        for sha256 in [sha256 for sha256, target in self.by_checksum.items() if target == path]:
+            others = [entry["path"] for bill_id, entry in self.manifest.items()
+                      if bill_id != str(keep_bill_id) and entry.get("sha256") == sha256
+                      and entry.get("path") != path and os.path.exists(entry["path"])]
+            if others:
+                self.by_checksum[sha256] = others[0]
+            else:
+                del self.by_checksum[sha256]
+
+    def _store(self, bill_id, url, part_path, final_path, sha256, response):
+        """
+        Move a finished download into place, linking to an identical existing file when there is one.
+        """
+        with self.lock:
+            existing = self.by_checksum.get(sha256)
+            duplicate = existing is not None and existing != final_path and os.path.exists(existing)
+            self._forget_path(final_path, bill_id)
+            if os.path.exists(final_path):
+                os.remove(final_path)
+            if duplicate:
+                os.remove(part_path)
+                try:
+                    os.link(existing, final_path)
+                except OSError:
+                    shutil.copyfile(existing, final_path)
+            else:
+                os.replace(part_path, final_path)
+                self.by_checksum[sha256] = final_path
+            self.manifest[str(bill_id)] = {
+                "url": url,
+                "path": final_path,
+                "sha256": sha256,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "duplicate_of": existing if duplicate else None,
+            }
+        return "duplicate" if duplicate else "downloaded"
+
+    def download(self, bill):
+        """
+        Download one {'id': ..., 'url': ...} entry to bill_{id}.pdf.
+        Returns one of 'downloaded', 'duplicate', 'unchanged', 'failed'.
+        """
+        bill_id = bill["id"]
+        url = bill["url"]
+        final_path = os.path.join(self.download_dir, f"bill_{bill_id}.pdf")
+        part_path = final_path + ".part"
+
+        headers = dict(HEADERS)
+        entry = self.manifest.get(str(bill_id))
+        if entry is None and os.path.exists(final_path):
+            # Downloaded before the manifest existed: adopt the file as it is
+            sha256 = file_sha256(final_path)
+            with self.lock:
+                self.manifest[str(bill_id)] = {"url": url, "path": final_path, "sha256": sha256,
+                                               "etag": None, "last_modified": None, "duplicate_of": None}
+                self.by_checksum.setdefault(sha256, final_path)
+            return "unchanged"
+        if os.path.exists(final_path) and entry and entry.get("url") == url:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code == 304:
+                    return "unchanged"
+                if response.status_code != 200:
+                    print(f"[{bill_id}]  Failed: status code {response.status_code}")
+                    return "failed"
+
+                digest = hashlib.sha256()
+                first_chunk = True
+                with open(part_path, "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        if first_chunk:
+                            # Guard against HTML error pages served with a 200
+                            if not chunk.startswith(b"%PDF"):
+                                print(f"[{bill_id}]  Failed: response is not a PDF")
+                                break
+                            first_chunk = False
+                        digest.update(chunk)
+                        f.write(chunk)
+                if first_chunk:
+                    os.remove(part_path)
+                    return "failed"
+
+                return self._store(bill_id, url, part_path, final_path, digest.hexdigest(), response)
+        except requests.exceptions.RequestException as e:
+            print(f"[{bill_id}]  Error: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return "failed"
+
+    def download_all(self, bill_data):
+        """
+        Download every bill in bill_data with max_workers concurrent transfers.
+        Returns a count of each outcome.
+        """
+        counts = {"downloaded": 0, "duplicate": 0, "unchanged": 0, "failed": 0}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for i, outcome in enumerate(executor.map(self.download, bill_data), 1):
+                counts[outcome] += 1
+                if i % 50 == 0:
+                    self.save_manifest()
+        self.save_manifest()
+        return counts
+
+
+if __name__ == "__main__":
+    codes = [18, 19, 28, 29]
+    for code in codes:
+        url_dictionary = f"{code}_17 to 39 url dictionary.txt"
+        if not os.path.exists(url_dictionary):
+            print(f"{url_dictionary} not found, skipping {code}")
+            continue
+        bill_list = read_url_dictionary(url_dictionary)
+        downloader = PdfDownloader(os.path.join(DOWNLOAD_BASE, f"{code}_17 to 39"))
+        counts = downloader.download_all(bill_list)
+        print(f"{code}: {counts}")
@@ -1,9 +1,9 @@
 import pandas as pd
 import numpy as np
-import ast
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, log_loss, classification_report
+from tabularFeatures import parse_seat_counts
 
 pd.set_option('display.max_columns', None)
 pd.set_option('display.max_colwidth', None)
@@ -14,14 +14,6 @@ df = pd.read_csv("bills_data.csv")
 print("Columns in CSV:", df.columns.tolist())
 print(df.head())
 
-def parse_seat_counts(val):
-    if pd.isnull(val):
-        return {}
-    try:
-        return ast.literal_eval(val)
-    except Exception as e:
-        return {}
-
 df["seat_counts_parsed"] = df["seat_counts"].apply(parse_seat_counts)
 
 df["Labour_seats"] = df["seat_counts_parsed"].apply(lambda d: d.get("Labour", 0))
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+CACHE_PATH = "http_cache.sqlite"
+# Bill and party data for past sessions does not change, a week keeps live sessions reasonably fresh
+DEFAULT_TTL = 7 * 24 * 3600
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+# PLUM_OFFLINE=1 serves every request from the cache and never touches the network
+OFFLINE = os.environ.get("PLUM_OFFLINE", "") not in ("", "0")
+
+
+class CacheMiss(Exception):
+    """
+    Raised in offline mode when a request is not in the cache.
+    """
+
+
+class ResponseCache:
+    """
+    On-disk cache of decoded JSON responses from the Parliament APIs.
+
+    Entries are keyed by a SHA-256 of (method, url, sorted params) and stored
+    zlib-compressed in a single SQLite file. Entries older than ttl seconds are
+    refetched, and the least recently used entries are evicted once the stored
+    bodies exceed max_bytes. A 404 is cached as a null body so missing bills are
+    not requested again.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=MAX_CACHE_BYTES, offline=OFFLINE):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._stores_since_evict = 0
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " url TEXT,"
+            " body BLOB,"
+            " size INTEGER,"
+            " fetched_at REAL,"
+            " accessed_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.conn.commit()
+
+    @staticmethod
+    def key(method, url, params=None):
+        params = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        raw = json.dumps([method.upper(), url, params], separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, url, params=None, method="GET"):
+        """
+        Returns (True, data) for a fresh cached response and (False, None) otherwise.
+        In offline mode stale entries are still served and a miss raises CacheMiss.
+        """
+        key = self.key(method, url, params)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and (self.offline or time.time() - row[1] <= self.ttl):
+                self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self.conn.commit()
+                self.hits += 1
+                body = row[0]
+                return True, (json.loads(zlib.decompress(body)) if body is not None else None)
+            self.misses += 1
+
+        if self.offline:
+            raise CacheMiss(f"{method} {url} {params or ''} is not cached (offline mode)")
+        return False, None
+
+    def store(self, url, data, params=None, method="GET"):
+        """
+        Cache a decoded JSON response; data=None records a 404.
+        """
+        key = self.key(method, url, params)
+        body = None
+        if data is not None:
+            body = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        size = len(body) if body is not None else 0
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, body, size, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, body, size, now, now),
+            )
+            self.conn.commit()
+            # Summing the sizes is a table scan, so only check the limit every so often
+            self._stores_since_evict += 1
+            if self._stores_since_evict >= 100:
+                self._stores_since_evict = 0
+                self._evict()
+
+    def invalidate(self, url, params=None, method="GET"):
+        """
+        Forget a cached response so the next request goes to the network.
+        """
+        key = self.key(method, url, params)
+        with self.lock:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop the least recently used entries until we are 10% under the limit
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            doomed.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.conn.commit()
+
+    def clear_expired(self):
+        """
+        Delete every entry older than the TTL.
+        """
+        with self.lock:
+            self.conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.ttl,))
+            self.conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Shared cache used by billRecord.get_json and the bill crawler.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+    return _cache
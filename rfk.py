@@ -2,37 +2,25 @@ import requests
 import urllib.parse
 from datetime import datetime
 
-API_BASE_URL = "https://bills-api.parliament.uk/api/v1/Bills"
+from billRecord import fetch_bill_record, progress_status, first_sponsor_party
 
-def get_bill_info(bill_id):
+def get_bill_info(record):
     """
-    Retrieve bill details and its progress for the given bill number.
+    Retrieve bill details and its progress from a fetched bill record.
     Expects the bill details JSON to include an 'introducedDate' (or 'lastUpdate') field.
     """
-    url = f"{API_BASE_URL}/{bill_id}"
-    headers = {"accept": "application/json"}
-    response = requests.get(url, headers=headers)
-    
-    try:
-        data = response.json()
-        if isinstance(data, dict):
-            long_title = data.get("longTitle", "N/A")
-            short_title = data.get("shortTitle", "N/A")
-            orig_house = data.get("originatingHouse", "N/A")
-            # Retrieve progress status via get_bill_progress (i.e. check_bill_progress)
-            progress_status = check_bill_progress(bill_id)
-            # For this example, use the 'lastUpdate' as the introduced date.
-            introduced_date = data.get("lastUpdate", None)
-            sessionID = data.get("introducedSessionId", "N/A")
-            
-            return bill_id, long_title, short_title, orig_house, progress_status, sessionID, introduced_date
-    except requests.exceptions.JSONDecodeError:
-        print(f"Error: Response for Bill ID {bill_id} is not valid JSON. Response:", response.text)
+    if record is None:
         return None
+    data = record["bill"]
+    long_title = data.get("longTitle", "N/A")
+    short_title = data.get("shortTitle", "N/A")
+    orig_house = data.get("originatingHouse", "N/A")
+    progress_status_value = progress_status(data)
+    # For this example, use the 'lastUpdate' as the introduced date.
+    introduced_date = data.get("lastUpdate", None)
+    sessionID = data.get("introducedSessionId", "N/A")
 
-    except requests.exceptions.JSONDecodeError:
-        print(f"Error: Response for Bill ID {bill_id} is not valid JSON. Response:", response.text)
-        return False
+    return record["bill_id"], long_title, short_title, orig_house, progress_status_value, sessionID, introduced_date
 
 def format_date_for_api(date_str):
     """
@@ -45,39 +33,6 @@ def format_date_for_api(date_str):
         return None
     return dt.strftime("%Y-%m-%d")
 
-def get_first_sponsor_party(bill_id):
-    """
-    Retrieve the party of the first sponsor of the given bill.
-    
-    Assumes that the bill sponsors are available via the endpoint:
-    /api/v1/Bills/{bill_id}/Sponsors and that the first sponsor's party
-    is available under the key path: value -> sponsorParty -> name.
-    """
-    url = f"{API_BASE_URL}/{bill_id}"
-    headers = {"accept": "application/json"}
-    response = requests.get(url, headers=headers)
-    
-    try:
-        data = response.json()
-        sponsor = data.get("sponsors",[])
-        if not sponsor:
-            print("No sponsors found for the bill.")
-            return None
-        
-        
-        # Get the first sponsor
-        sponsor_party = sponsor[0]["member"]["party"]
-        
-        if sponsor_party:
-            return sponsor_party
-        else:
-            print("Sponsor party information not available.")
-            return None
-    except Exception as e:
-        print("Error retrieving sponsor info:", e)
-        return None
-
-
 def get_commons_seat_counts(for_date):
     """
     Retrieve the state of the parties in the House of Commons on a given date,
@@ -109,29 +64,11 @@ def get_commons_seat_counts(for_date):
         print("Response:", response.text)
         return None
 
-def check_bill_progress(bill_id):
-    """Checks if a bill is an act using the isAct field from the API."""
-    url = f"https://bills-api.parliament.uk/api/v1/Bills/{bill_id}"  
-    headers = {"accept": "application/json"}  
-    
-    response = requests.get(url, headers=headers)
-
-    try:
-        data = response.json()  
-        if 'isAct' in data:
-            return 2 if data['isAct'] else 1
-        else:
-            print(f"'isAct' field not found for Bill ID {bill_id}")
-            return 3  
-
-    except requests.exceptions.JSONDecodeError:
-        print(f"Error: Response for Bill ID {bill_id} is not valid JSON. Response:", response.text)
-        return False
-
 bill_number = input("Enter bill number: ")
 
-bill_details = get_bill_info(bill_number)
-sponsor_party = get_first_sponsor_party(bill_number)
+bill_record = fetch_bill_record(bill_number, include_stages=False)
+bill_details = get_bill_info(bill_record)
+sponsor_party = first_sponsor_party(bill_record["bill"], default=None) if bill_record else None
 if sponsor_party:
     print(f"First Sponsor's Party: {sponsor_party}")
 else:
@@ -333,35 +270,30 @@ import urllib.parse
 import pandas as pd
 from datetime import datetime
 
+from billRecord import get_json, fetch_bill_record, first_sponsor_party
+from billDiscovery import add_detail_fields, discover_bills
+
 API_BASE_URL = "https://bills-api.parliament.uk/api/v1/Bills"
 
 def get_bill_info(bill_id):
     """
     Retrieve bill details and its progress for the given bill number.
     Uses the 'lastUpdate' field as the introduced date.
+    The bill JSON is fetched once; the sponsor party is read from the same record.
     """
-    url = f"{API_BASE_URL}/{bill_id}"
-    headers = {"accept": "application/json"}
-    response = requests.get(url, headers=headers)
-    
     try:
-        data = response.json()
-        if isinstance(data, dict):
-            long_title = data.get("longTitle", "N/A")
-            short_title = data.get("shortTitle", "N/A")
-            orig_house = data.get("originatingHouse", "N/A")
-            progress_status = check_bill_progress(bill_id)
-            introduced_date = data.get("lastUpdate", None)
-            sessionID = data.get("introducedSessionId", "N/A")
-            
+        record = fetch_bill_record(bill_id, include_stages=False)
+        if record is not None:
+            data = record["bill"]
             return {
                 "bill_id": bill_id,
-                "long_title": long_title,
-                "short_title": short_title,
-                "originating_house": orig_house,
-                "progress_status": progress_status,
-                "sessionID": sessionID,
-                "introduced_date": introduced_date
+                "long_title": data.get("longTitle", "N/A"),
+                "short_title": data.get("shortTitle", "N/A"),
+                "originating_house": data.get("originatingHouse", "N/A"),
+                "progress_status": check_bill_progress(bill_id),
+                "sessionID": data.get("introducedSessionId", "N/A"),
+                "introduced_date": data.get("lastUpdate", None),
+                "sponsor_party": first_sponsor_party(data)
             }
     except Exception as e:
         print(f"Error processing bill id {bill_id}: {e}")
@@ -376,11 +308,9 @@ def check_bill_progress(bill_id):
         3 otherwise.
     """
     url = f"{API_BASE_URL}/{bill_id}/NewsArticles"
-    headers = {"accept": "text/plain"}
     
-    response = requests.get(url, headers=headers)
     try:
-        data = response.json()
+        data = get_json(url)
         if not isinstance(data, dict) or "items" not in data:
             print(f"Unexpected response format for Bill ID {bill_id}: {data}")
             return None
@@ -402,27 +332,6 @@ def check_bill_progress(bill_id):
         print(f"Error checking progress for bill id {bill_id}: {e}")
         return None
 
-def get_first_sponsor_party(bill_id):
-    """
-    Retrieve the party of the first sponsor of the given bill.
-    Assumes that the bill sponsors are available under the key "sponsors".
-    """
-    url = f"{API_BASE_URL}/{bill_id}"
-    headers = {"accept": "application/json"}
-    response = requests.get(url, headers=headers)
-    
-    try:
-        data = response.json()
-        sponsors = data.get("sponsors", [])
-        if sponsors:
-            sponsor_party = sponsors[0].get("member", {}).get("party", "N/A")
-            return sponsor_party
-        else:
-            return None
-    except Exception as e:
-        print(f"Error retrieving sponsor info for bill id {bill_id}: {e}")
-        return None
-
 def format_date_for_api(date_str):
     """
     Convert an ISO date string (e.g., "2007-10-27T16:26:00") to the format YYYY-MM-DD.
@@ -442,11 +351,9 @@ def get_commons_seat_counts(for_date):
     base_url = "https://members-api.parliament.uk/api/Parties/StateOfTheParties"
     encoded_date = urllib.parse.quote(for_date)
     url = f"{base_url}/commons/{encoded_date}"
-    headers = {"accept": "application/json"}
     
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        data = response.json()
+    data = get_json(url)
+    if data is not None:
         items = data.get("items", [])
         party_seat_counts = {}
         for item in items:
@@ -457,35 +364,65 @@ def get_commons_seat_counts(for_date):
             party_seat_counts[party_name] = total_seats
         return party_seat_counts
     else:
-        print(f"Error: Unable to retrieve Commons data for date {for_date} (Status Code: {response.status_code})")
+        print(f"Error: Unable to retrieve Commons data for date {for_date}")
         return None
 
-def collect_bills_data(start_id, end_id):
+def add_seat_counts(info):
+    """
+    Add the formatted introduced date and the Commons seat counts on that day to a bill's info.
+    """
+    if info["introduced_date"]:
+        formatted_date = format_date_for_api(info["introduced_date"])
+        info["formatted_date"] = formatted_date
+        info["seat_counts"] = get_commons_seat_counts(formatted_date)
+    else:
+        info["formatted_date"] = None
+        info["seat_counts"] = None
+    return info
+
+def collect_bills_data(bill_ids):
     """
-    Loop over a range of bill IDs and collect their information.
+    Loop over the given bill IDs and collect their information.
     Returns a list of dictionaries with bill data.
     """
     results = []
-    for bill_id in range(start_id, end_id + 1):
+    for bill_id in bill_ids:
         info = get_bill_info(bill_id)
         if info is not None:
-            sponsor_party = get_first_sponsor_party(bill_id)
-            info["sponsor_party"] = sponsor_party if sponsor_party else "N/A"
-            if info["introduced_date"]:
-                formatted_date = format_date_for_api(info["introduced_date"])
-                info["formatted_date"] = formatted_date
-                seat_counts = get_commons_seat_counts(formatted_date)
-                info["seat_counts"] = seat_counts
-            else:
-                info["formatted_date"] = None
-                info["seat_counts"] = None
-            results.append(info)
+            results.append(add_seat_counts(info))
         else:
             print(f"No data for bill id {bill_id}")
     return results
 
+def collect_discovered_bills_data(bills):
+    """
+    Build the same records as collect_bills_data from discovered bills.
+    House, session and progress (isAct) come from the list pages and lastUpdate stands in
+    for the introduced date as in get_bill_info, so each bill costs a single detail call
+    for its long title and sponsor party and no Stages call.
+    """
+    results = []
+    for bill in sorted(bills.values(), key=lambda bill: bill["bill_id"]):
+        detailed = add_detail_fields(bill, fields=("long_title", "sponsor_party"))
+        if detailed is None:
+            print(f"No data for bill id {bill['bill_id']}")
+            continue
+        info = {
+            "bill_id": detailed["bill_id"],
+            "long_title": detailed["long_title"],
+            "short_title": detailed["short_title"],
+            "originating_house": detailed["originating_house"],
+            "progress_status": detailed["progress_status"],
+            "sessionID": detailed["sessionID"],
+            "introduced_date": detailed["last_update"],
+            "sponsor_party": detailed["sponsor_party"],
+        }
+        results.append(add_seat_counts(info))
+    return results
+
 if __name__ == "__main__":
-    bills_data = collect_bills_data(1, 1000)
+    # Only bills that exist, read from the session-filtered list pages instead of probing 1..1000
+    bills_data = collect_discovered_bills_data(discover_bills(range(17, 40)))
     
     df = pd.DataFrame(bills_data)
     print(df.head())
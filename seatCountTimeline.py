@@ -0,0 +1,133 @@
+import bisect
+import json
+import os
+import threading
+
+SEAT_COUNTS_PATH = "commons_seat_counts.jsonl"
+
+
+class SeatCountTimeline:
+    """
+    Commons seat counts indexed by date.
+
+    The state of the parties only changes at elections, defections and by-elections,
+    so counts are fetched once per distinct date and appended to a JSONL file
+    ({"date": "YYYY-MM-DD", "seat_counts": {...}} per line). Sampled dates whose
+    snapshots are identical to their neighbour are collapsed into one interval;
+    any date inside an interval is answered with a bisect lookup and no request.
+    Dates that fall between two different snapshots are fetched, since the change
+    happened somewhere in that gap.
+    """
+
+    def __init__(self, path=SEAT_COUNTS_PATH, fetch_counts=None):
+        self.path = path
+        self.fetch_counts = fetch_counts
+        self.snapshots = {}
+        self.lock = threading.Lock()
+        self.requests_made = 0
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A crash can leave a partial last line behind
+                        continue
+                    self.snapshots[entry["date"]] = entry["seat_counts"]
+        self._rebuild()
+
+    def _rebuild(self):
+        """
+        Collapse the sorted snapshots into change-point intervals [start, end].
+        """
+        self.interval_starts = []
+        self.interval_ends = []
+        self.interval_counts = []
+        for for_date in sorted(self.snapshots):
+            counts = self.snapshots[for_date]
+            if self.interval_counts and self.interval_counts[-1] == counts:
+                self.interval_ends[-1] = for_date
+            else:
+                self.interval_starts.append(for_date)
+                self.interval_ends.append(for_date)
+                self.interval_counts.append(counts)
+
+    def lookup(self, for_date):
+        """
+        Seat counts for a YYYY-MM-DD date if the timeline already covers it, else None.
+        """
+        with self.lock:
+            i = bisect.bisect_right(self.interval_starts, for_date) - 1
+            if i >= 0 and for_date <= self.interval_ends[i]:
+                return self.interval_counts[i]
+        return None
+
+    def add(self, for_date, counts):
+        """
+        Record a fetched snapshot in memory and append it to the on-disk store.
+        """
+        with self.lock:
+            self.snapshots[for_date] = counts
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"date": for_date, "seat_counts": counts}) + "\n")
+            self._rebuild()
+
+    def get(self, for_date, fetch=None):
+        """
+        Seat counts on for_date, fetching (and storing) them only when the
+        timeline cannot answer. fetch is passed through to fetch_counts so callers
+        such as the concurrent crawler can supply their own HTTP function.
+        """
+        counts = self.lookup(for_date)
+        if counts is not None:
+            return counts
+        if self.fetch_counts is None:
+            return None
+
+        counts = self.fetch_counts(for_date, fetch) if fetch else self.fetch_counts(for_date)
+        self.requests_made += 1
+        if counts is not None:
+            self.add(for_date, counts)
+        return counts
+
+    def prefetch(self, dates):
+        """
+        Make sure every distinct date in dates can be answered locally.
+
+        The sorted dates are bisected: if both ends of a range have the same
+        snapshot the whole range is covered by one interval, otherwise the range
+        is split. The number of requests grows with the number of seat changes
+        rather than the number of dates.
+        """
+        dates = sorted(set(d for d in dates if d))
+        pending = [(0, len(dates) - 1)] if dates else []
+        while pending:
+            lo, hi = pending.pop()
+            lo_counts = self.get(dates[lo])
+            hi_counts = self.get(dates[hi])
+            if hi - lo <= 1 or lo_counts == hi_counts:
+                continue
+            if lo_counts is None or hi_counts is None:
+                for for_date in dates[lo + 1:hi]:
+                    self.get(for_date)
+                continue
+            mid = (lo + hi) // 2
+            pending.append((lo, mid))
+            pending.append((mid, hi))
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from getBillData import get_commons_seat_counts
+
+    # Warm the timeline with every date already present in the collected data
+    df = pd.read_excel("collected_bills_data.xlsx")
+    timeline = SeatCountTimeline(fetch_counts=get_commons_seat_counts)
+    timeline.prefetch(df["formatted_date"].dropna().astype(str))
+
+    print(f"{len(timeline.snapshots)} dates stored, {len(timeline.interval_starts)} distinct intervals, "
+          f"{timeline.requests_made} requests made.")
@@ -0,0 +1,102 @@
+import numpy as np
+
+from tokenCorpus import TokenCorpus
+
+# Sentences read from disk per block, and blocks mixed together in memory at a time:
+# at most BLOCK_SENTENCES * BUFFER_BLOCKS sentences are held as Python lists
+BLOCK_SENTENCES = 1024
+BUFFER_BLOCKS = 8
+
+
+class StreamingCorpus:
+    """
+    Restartable iterable over the sentences of one or more token corpora, streamed from their mmaps.
+
+    Every pass reads the sentences again from disk, so it can be handed straight to
+    Word2Vec build_vocab and train, which iterate it once per epoch. Without a seed the
+    sentences come in corpus order. With a seed each pass visits the blocks of
+    BLOCK_SENTENCES sentences in a new random order and shuffles the sentences within
+    every BUFFER_BLOCKS blocks it holds, so memory stays bounded by that buffer rather
+    than by the size of the corpus. The order depends only on the seed and the pass
+    number, so a run is reproducible.
+
+    documents optionally restricts each corpus to some of its documents: one array of
+    document indices per corpus, or None to keep a corpus whole.
+    """
+
+    def __init__(self, corpus_dirs, seed=None, block_sentences=BLOCK_SENTENCES, buffer_blocks=BUFFER_BLOCKS,
+                 documents=None):
+        if isinstance(corpus_dirs, str):
+            corpus_dirs = [corpus_dirs]
+        self.corpus_dirs = list(corpus_dirs)
+        self.documents = list(documents) if documents is not None else [None] * len(self.corpus_dirs)
+        self.seed = seed
+        self.block_sentences = block_sentences
+        self.buffer_blocks = buffer_blocks
+        self.passes = 0
+        self._corpora = None
+
+    @property
+    def corpora(self):
+        # Opened lazily so the object stays cheap to pickle into worker processes
+        if self._corpora is None:
+            self._corpora = [TokenCorpus(corpus_dir) for corpus_dir in self.corpus_dirs]
+        return self._corpora
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_corpora"] = None
+        return state
+
+    def sentence_runs(self, c):
+        """
+        (first sentence, end sentence) of the runs of consecutive selected documents of corpus c.
+        """
+        corpus = self.corpora[c]
+        if self.documents[c] is None:
+            return [(0, corpus.n_sentences)]
+        docs = np.unique(np.asarray(self.documents[c], dtype=np.int64))
+        if not len(docs):
+            return []
+        breaks = np.nonzero(np.diff(docs) != 1)[0]
+        firsts = np.concatenate([docs[:1], docs[breaks + 1]])
+        lasts = np.concatenate([docs[breaks], docs[-1:]])
+        doc_offsets = np.asarray(corpus.doc_offsets)
+        return list(zip(doc_offsets[firsts].tolist(), doc_offsets[lasts + 1].tolist()))
+
+    def __len__(self):
+        return sum(stop - start for c in range(len(self.corpora)) for start, stop in self.sentence_runs(c))
+
+    def total_words(self):
+        total = 0
+        for c, corpus in enumerate(self.corpora):
+            for start, stop in self.sentence_runs(c):
+                total += int(corpus.sentence_offsets[stop] - corpus.sentence_offsets[start])
+        return total
+
+    def blocks(self):
+        """
+        (corpus index, first sentence, end sentence) of every block, in corpus order.
+        """
+        return [(c, start, min(start + self.block_sentences, stop))
+                for c in range(len(self.corpora))
+                for first, stop in self.sentence_runs(c)
+                for start in range(first, stop, self.block_sentences)]
+
+    def __iter__(self):
+        blocks = self.blocks()
+        if self.seed is None:
+            for c, start, stop in blocks:
+                yield from self.corpora[c].sentence_range(start, stop)
+            return
+
+        rng = np.random.default_rng([self.seed, self.passes])
+        self.passes += 1
+        order = rng.permutation(len(blocks))
+        for first in range(0, len(order), self.buffer_blocks):
+            buffer = []
+            for b in order[first:first + self.buffer_blocks]:
+                c, start, stop = blocks[b]
+                buffer.extend(self.corpora[c].sentence_range(start, stop))
+            for i in rng.permutation(len(buffer)):
+                yield buffer[i]
@@ -0,0 +1,88 @@
+import csv
+import os
+
+import pandas as pd
+
+from crawlJournal import drop_partial_line
+from tokenCorpus import splitSentences
+from w2vScoring import CATEGORIES, classify_document
+
+INPUT_BASE = "cleanedTexWithID"
+# Kept apart from fullTextProbabilities: those files hold normalized per-class probabilities,
+# while these doc_probs are the mean log-likelihoods classify_document returns
+OUTPUT_BASE = "streamedProbabilities"
+SPLITS = ["Training", "Validation", "Testing"]
+CHUNK_ROWS = 64
+
+
+def completed_ids(output_path, id_column='id'):
+    """
+    Ids of the bills already scored into output_path.
+    """
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return set()
+    return set(pd.read_csv(output_path, usecols=[id_column], dtype=str)[id_column])
+
+
+def stream_score_csv(input_path, output_path, scorer, text_column='extracted_text', id_column='id',
+                     window=7, chunksize=CHUNK_ROWS):
+    """
+    Score a bill-text CSV into output_path (id, predicted_class, doc_probs) without loading it whole.
+
+    The input is read chunksize rows at a time and each bill's row is appended to the
+    output and flushed as soon as it is scored. Bills whose id is already in the output
+    are skipped, so rerunning after a crash carries on where the last run stopped.
+    A bill with no text or no scoreable sentence gets an empty predicted_class and
+    doc_probs rather than a class picked from NaNs. Returns the number of bills scored by this run.
+    """
+    drop_partial_line(output_path)
+    done = completed_ids(output_path, id_column)
+    write_header = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    scored = 0
+    with open(output_path, "a", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        if write_header:
+            writer.writerow([id_column, 'predicted_class', 'doc_probs'])
+        for chunk in pd.read_csv(input_path, usecols=[id_column, text_column], dtype={id_column: str},
+                                 chunksize=chunksize, on_bad_lines='skip'):
+            for bill_id, text in zip(chunk[id_column], chunk[text_column]):
+                if bill_id in done:
+                    continue
+                sentences = splitSentences(text) if isinstance(text, str) else []
+                sentence_scores = scorer.score_document(sentences, window) if sentences else []
+                if len(sentence_scores):
+                    predicted_idx, doc_probs = classify_document(sentence_scores)
+                    writer.writerow([bill_id, scorer.categories[predicted_idx], str(doc_probs)])
+                else:
+                    writer.writerow([bill_id, '', ''])
+                out.flush()
+                done.add(bill_id)
+                scored += 1
+            os.fsync(out.fileno())
+    return scored
+
+
+def stream_score_all(scorer, codes=CATEGORIES.values(), splits=SPLITS, input_base=INPUT_BASE,
+                     output_base=OUTPUT_BASE):
+    """
+    Stream-score the training, validation and testing CSV of every category code.
+    """
+    for code in codes:
+        for split in splits:
+            file_name = f"{split.lower()}_text{code}.csv"
+            input_path = os.path.join(input_base, str(code), split, file_name)
+            if not os.path.exists(input_path):
+                print(f"{input_path} not found, skipping")
+                continue
+            output_path = os.path.join(output_base, str(code), split, file_name)
+            scored = stream_score_csv(input_path, output_path, scorer)
+            print(f"{output_path}: scored {scored} bills")
+
+
+if __name__ == "__main__":
+    from modelRegistry import load_scorer
+
+    # Stacked vectors memory-mapped from the registry (export them with modelRegistry.py first)
+    stream_score_all(load_scorer("fulltext"))
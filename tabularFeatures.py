@@ -0,0 +1,26 @@
+import ast
+
+import pandas as pd
+
+
+# Parse seat_counts (stored as a stringified dictionary)
+def parse_seat_counts(val):
+    if pd.isnull(val):
+        return {}
+    try:
+        return ast.literal_eval(val)
+    except Exception:
+        return {}
+
+
+# Parse the doc_prob column (string of a numpy array to a list of floats)
+def parse_doc_prob(val):
+    if not isinstance(val, str):
+        # Feature store tables hold it as a list of floats already
+        return [float(x) for x in val] if hasattr(val, "__len__") else []
+    try:
+        val = val.strip("[]")
+        parts = val.split()
+        return [float(x) for x in parts]
+    except Exception:
+        return []
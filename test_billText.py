@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from benchmarkCleaner import legacy_clean_text
+from billText import StreamingCleaner, clean_pages
+
+# Pieces bill text is made of, weighted towards the ones the cleaner treats specially
+PIECES = ["section", "Act", "the", "Secretary", "é", "_", "a1", "12", "2024", "3", " ", " ", "  ", "\n", "\t",
+          "(", ")", "(a)", "(12", ".", ",", ";", ":", "-", "£", "§"]
+
+
+def random_text(rng, length):
+    return "".join(rng.choice(PIECES) for _ in range(length))
+
+
+def random_pages(rng, text):
+    """
+    text split at random points, with blank and whitespace-only pages slipped in.
+    """
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 8))))
+    pages = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+    for _ in range(rng.randint(0, 3)):
+        pages.insert(rng.randint(0, len(pages)), rng.choice(["", " ", "\n", " \n\t "]))
+    return pages
+
+
+def streamed(pieces):
+    cleaner = StreamingCleaner()
+    return "".join(cleaner.feed(piece) for piece in pieces) + cleaner.finish()
+
+
+@pytest.mark.parametrize("pages", [
+    [],
+    ["", " ", "\n"],
+    ["Section (unclosed 12 and", " the rest stays"],
+    ["Section (closed", " later) 12 stays out"],
+    ["page 1", "2 digits run across", "3"],
+    ["a1", "23 b", "4_5", " 67"],
+    ["ends with a digit 1", "", "  ", "2 starts the next page"],
+])
+def test_clean_pages_matches_legacy_cases(pages):
+    assert "".join(clean_pages(pages)) == legacy_clean_text(" ".join(pages))
+
+
+def test_clean_pages_matches_legacy_random_pages():
+    rng = random.Random(0)
+    for _ in range(500):
+        pages = random_pages(rng, random_text(rng, rng.randint(0, 60)))
+        assert "".join(clean_pages(pages)) == legacy_clean_text(" ".join(pages)), pages
+
+
+def test_streaming_cleaner_matches_legacy_any_split():
+    # Splits inside words and digit runs too, not only at page breaks
+    rng = random.Random(1)
+    for _ in range(500):
+        text = random_text(rng, rng.randint(0, 60))
+        pieces = random_pages(rng, text)
+        assert streamed(pieces) == legacy_clean_text("".join(pieces)), pieces
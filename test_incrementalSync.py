@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("requests")
+
+import incrementalSync
+
+
+def test_mark_advances_when_only_untracked_bills_changed(tmp_path, monkeypatch):
+    csv_path = tmp_path / "18_17 to 39.csv"
+    pd.DataFrame({"Bill Id": [100], "SessionID": [39]}).to_csv(csv_path, index=False)
+    state_path = str(tmp_path / "sync_state.json")
+    incrementalSync.save_sync_state({"high_water_mark": "2024-01-01T00:00:00", "pending_ids": []}, state_path)
+
+    summaries = [
+        {"billId": 900, "lastUpdate": "2024-01-05T00:00:00", "introducedSessionId": 10},
+        {"billId": 901, "lastUpdate": "2024-01-03T00:00:00", "introducedSessionId": 11},
+        {"billId": 100, "lastUpdate": "2023-12-01T00:00:00", "introducedSessionId": 39},
+    ]
+    monkeypatch.setattr(incrementalSync, "OFFLINE", False)
+    monkeypatch.setattr(incrementalSync, "iter_bill_summaries", lambda params, **kwargs: iter(summaries))
+
+    def no_crawl(*args, **kwargs):
+        raise AssertionError("nothing should be crawled")
+    monkeypatch.setattr(incrementalSync, "BillCrawler", no_crawl)
+
+    records = incrementalSync.sync(state_path=state_path, output_excel=str(tmp_path / "out.xlsx"),
+                                   category_csvs=[str(csv_path)])
+
+    assert records == []
+    state = incrementalSync.load_sync_state(state_path)
+    assert state["high_water_mark"] == "2024-01-05T00:00:00"
+    assert state["pending_ids"] == []
+    assert "last_run" in state
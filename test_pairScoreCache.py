@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pytest
+
+gensim_models = pytest.importorskip("gensim.models")
+
+from pairScoreCache import ADMIT_AFTER, PairScoreCache
+from w2vScoring import TITLE_MODEL_PATHS, band_pairs, score_document, sentence_rows
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+WINDOW = 7
+# The table and cached rows hold float32 log-probabilities, so sums drift by about 3e-4
+RTOL = 1e-5
+ATOL = 1e-3
+# Small enough that bill-like sentences mix table, row and computed pairs
+TOP_N = 300
+LRU_SIZE = 50
+
+
+@pytest.fixture(scope="module")
+def models():
+    return {key: gensim_models.Word2Vec.load(os.path.join(REPO_DIR, path))
+            for key, path in TITLE_MODEL_PATHS.items()}
+
+
+@pytest.fixture(scope="module")
+def documents(models):
+    """
+    Seeded documents drawing from the whole vocabulary, with some words repeated
+    across documents so their rows get admitted to the LRU.
+    """
+    rng = np.random.default_rng(0)
+    vocab = next(iter(models.values())).wv.index_to_key
+    recurring = [vocab[i] for i in rng.integers(TOP_N, len(vocab), size=20)]
+    documents = []
+    for _ in range(2 * ADMIT_AFTER):
+        document = []
+        for length in [1, 3, 12, 40]:
+            words = [vocab[i] for i in rng.integers(0, len(vocab), size=length)]
+            words[::3] = recurring[:len(words[::3])]
+            document.append(words)
+        documents.append(document)
+    return documents
+
+
+def test_cached_scores_match_uncached(models, documents, tmp_path):
+    pair_caches = {key: PairScoreCache(model, TOP_N, LRU_SIZE, cache_dir=str(tmp_path))
+                   for key, model in models.items()}
+    for sentences in documents:
+        expected = score_document(sentences, models, WINDOW)
+        np.testing.assert_allclose(score_document(sentences, models, WINDOW, pair_caches), expected,
+                                   rtol=RTOL, atol=ATOL)
+    for cache in pair_caches.values():
+        assert cache.table_hits and cache.lru_hits and cache.misses
+
+
+def test_counters_add_up_to_pairs(models, documents, tmp_path):
+    model = next(iter(models.values()))
+    cache = PairScoreCache(model, TOP_N, LRU_SIZE, cache_dir=str(tmp_path))
+    n_pairs = 0
+    for sentences in documents:
+        for sentence in sentences:
+            positions, rows = sentence_rows(sentence, model.wv)
+            first, second = band_pairs(positions, WINDOW)
+            cache.log_probs(rows[first], rows[second])
+            n_pairs += len(first)
+    assert cache.table_hits + cache.lru_hits + cache.misses == n_pairs
+
+
+def test_rows_admitted_in_a_batch_count_as_hits(models, tmp_path):
+    model = next(iter(models.values()))
+    cache = PairScoreCache(model, TOP_N, LRU_SIZE, cache_dir=str(tmp_path))
+    rare, frequent = np.array([TOP_N + 1]), np.array([0])
+    for _ in range(ADMIT_AFTER):
+        cache.log_probs(rare, frequent)
+    assert (cache.lru_hits, cache.misses) == (0, ADMIT_AFTER)
+    # This batch admits the rare word's row and reads the pair from it
+    cache.log_probs(rare, frequent)
+    assert (cache.lru_hits, cache.misses) == (1, ADMIT_AFTER)
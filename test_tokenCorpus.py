@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+import tokenCorpus
+from tokenCorpus import corpus_dir_for, text_file_corpus
+
+
+@pytest.fixture(autouse=True)
+def stop_words(monkeypatch):
+    # Keeps the tests independent of the NLTK data being downloaded
+    monkeypatch.setattr(tokenCorpus, "get_stop_words", lambda: frozenset({"the", "of"}))
+
+
+def write_lines(path, lines):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"\n".join(lines) + b"\n")
+    return path
+
+
+def test_same_file_name_in_different_folders_gets_its_own_corpus(tmp_path):
+    base = str(tmp_path / "corpora")
+    first = write_lines(str(tmp_path / "18" / "Training" / "text.txt"), [b"the first bill. of words"])
+    second = write_lines(str(tmp_path / "19" / "Training" / "text.txt"), [b"another bill entirely"])
+    assert corpus_dir_for(first, base) != corpus_dir_for(second, base)
+    assert list(text_file_corpus(first, corpus_base=base)) == [[["first", "bill"], ["words"]]]
+    assert list(text_file_corpus(second, corpus_base=base)) == [[["another", "bill", "entirely"]]]
+
+
+def test_decode_error_leaves_no_corpus(tmp_path):
+    base = str(tmp_path / "corpora")
+    path = write_lines(str(tmp_path / "text.txt"), [b"a good line"] * 5000 + [b"a bad \xff line"])
+    with pytest.raises(UnicodeDecodeError):
+        text_file_corpus(path, corpus_base=base)
+    assert os.listdir(base) == []
+
+    # Once the file is fixed it is tokenized in full
+    write_lines(path, [b"a good line"] * 5001)
+    assert len(text_file_corpus(path, corpus_base=base)) == 5001
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pytest
+
+gensim_models = pytest.importorskip("gensim.models")
+
+from w2vScoring import (TITLE_MODEL_PATHS, MultiModelScorer, score_document, score_document_reference,
+                        score_sentence, score_sentence_reference)
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+WINDOW = 7
+# The reference accumulates float32 logs pair by pair, so only float32-level agreement is expected
+RTOL = 1e-5
+ATOL = 1e-3
+
+
+@pytest.fixture(scope="module")
+def models():
+    return {key: gensim_models.Word2Vec.load(os.path.join(REPO_DIR, path))
+            for key, path in TITLE_MODEL_PATHS.items()}
+
+
+@pytest.fixture(scope="module")
+def sentences(models):
+    """
+    Seeded sentences of in-vocabulary words with some unknown ones mixed in, including
+    sentences too short to hold a pair and longer than the scorer's row block.
+    """
+    rng = np.random.default_rng(0)
+    vocab = next(iter(models.values())).wv.index_to_key
+    sentences = [[], ["only"], [vocab[0], "notaword"]]
+    for length in [2, 5, 12, 40, 300]:
+        words = [vocab[i] for i in rng.integers(0, min(len(vocab), 2000), size=length)]
+        for position in rng.integers(0, length, size=length // 5):
+            words[position] = f"unknownword{position}"
+        sentences.append(words)
+    return sentences
+
+
+def test_score_sentence_matches_reference(models, sentences):
+    for model in models.values():
+        for sentence in sentences:
+            expected = score_sentence_reference(sentence, model, WINDOW)
+            assert score_sentence(sentence, model, WINDOW) == pytest.approx(expected, rel=RTOL, abs=ATOL)
+
+
+def test_score_document_matches_reference(models, sentences):
+    expected = score_document_reference(sentences, models, WINDOW)
+    np.testing.assert_allclose(score_document(sentences, models, WINDOW), expected, rtol=RTOL, atol=ATOL)
+
+
+def test_multi_model_scorer_matches_reference(models, sentences):
+    expected = score_document_reference(sentences, models, WINDOW)
+    scorer = MultiModelScorer(models, WINDOW)
+    np.testing.assert_allclose(scorer.score_document(sentences, WINDOW), expected, rtol=RTOL, atol=ATOL)
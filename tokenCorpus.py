@@ -0,0 +1,287 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+from functools import lru_cache
+
+import numpy as np
+
+from fileHash import file_sha256
+
+CORPUS_BASE = "tokenCorpus"
+# Bump when splitSentences or the on-disk layout changes so stored corpora are rebuilt
+TOKENIZER_VERSION = 1
+
+_SENTENCE_SPLIT = re.compile(r'\.\s+')
+
+
+@lru_cache(maxsize=None)
+def get_stop_words():
+    """
+    NLTK's English stopwords, loaded once per process instead of once per document.
+    """
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+def splitSentences(text):
+    """
+    Split cleaned text on '. ' into sentences, each a list of words with stopwords removed.
+    """
+    sentences = _SENTENCE_SPLIT.split(text)
+    stop_words = get_stop_words()
+
+    sentences = [sentence.strip() for sentence in sentences if sentence.strip()]
+    filtered_sentences = []
+    for sentence in sentences:
+        words = sentence.split()
+        filtered_words = [word for word in words if word.lower() not in stop_words]
+        filtered_sentences.append(filtered_words)
+
+    return filtered_sentences
+
+
+def _memmap(path, dtype, length):
+    # np.memmap refuses zero-length files
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(length,))
+
+
+class TokenCorpus:
+    """
+    A tokenized corpus stored as flat arrays and opened with mmap.
+
+    Every word of every document is a vocabulary id in tokens.int32.
+    sentence_offsets.int64 marks where each sentence starts in tokens and
+    doc_offsets.int64 marks where each document starts in sentence_offsets, so a
+    document's sentences are zero-copy slices of the token array. vocab.json
+    maps ids back to words and keys.json holds one key per document (a bill id
+    or a row index).
+    """
+
+    def __init__(self, corpus_dir):
+        self.corpus_dir = corpus_dir
+        with open(os.path.join(corpus_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(corpus_dir, "vocab.json"), "r", encoding="utf-8") as f:
+            self.vocab = json.load(f)
+        with open(os.path.join(corpus_dir, "keys.json"), "r", encoding="utf-8") as f:
+            self.keys = json.load(f)
+
+        self.tokens = _memmap(os.path.join(corpus_dir, "tokens.int32"), np.int32, self.meta["n_tokens"])
+        self.sentence_offsets = _memmap(os.path.join(corpus_dir, "sentence_offsets.int64"), np.int64,
+                                        self.meta["n_sentences"] + 1)
+        self.doc_offsets = _memmap(os.path.join(corpus_dir, "doc_offsets.int64"), np.int64,
+                                   self.meta["n_documents"] + 1)
+        self._vocab_array = np.array(self.vocab, dtype=object)
+        self._word_index = None
+
+    def __len__(self):
+        return self.meta["n_documents"]
+
+    @property
+    def word_index(self):
+        if self._word_index is None:
+            self._word_index = {word: i for i, word in enumerate(self.vocab)}
+        return self._word_index
+
+    def document(self, i):
+        """
+        Sentences of document i as int32 views into the token array.
+        """
+        offsets = self.sentence_offsets[self.doc_offsets[i]:self.doc_offsets[i + 1] + 1]
+        return [self.tokens[offsets[k]:offsets[k + 1]] for k in range(len(offsets) - 1)]
+
+    def document_words(self, i):
+        """
+        Sentences of document i as lists of words, the same as splitSentences gave for its text.
+        """
+        return [self._vocab_array[sentence].tolist() for sentence in self.document(i)]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.document_words(i)
+
+    def sentences(self):
+        """
+        Every sentence of the corpus as a list of words, in document order.
+        """
+        for i in range(len(self)):
+            yield from self.document_words(i)
+
+    @property
+    def n_sentences(self):
+        return self.meta["n_sentences"]
+
+    def sentence_range(self, start, stop):
+        """
+        Sentences start..stop-1 of the whole corpus as lists of words.
+        """
+        offsets = np.asarray(self.sentence_offsets[start:stop + 1])
+        tokens = np.asarray(self.tokens[offsets[0]:offsets[-1]]) if len(offsets) else np.zeros(0, np.int32)
+        words = self._vocab_array[tokens]
+        bounds = offsets - offsets[0] if len(offsets) else offsets
+        return [words[bounds[k]:bounds[k + 1]].tolist() for k in range(len(bounds) - 1)]
+
+
+def line_sentence_file(corpus):
+    """
+    The corpus written as one space-separated sentence per line, the format gensim's
+    corpus_file training reads. Written once into the corpus folder, so it is rebuilt
+    along with the corpus. Returns (path, number of words).
+    """
+    path = os.path.join(corpus.corpus_dir, "sentences.txt")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for sentence in corpus.sentences():
+                f.write(" ".join(sentence))
+                f.write("\n")
+        os.replace(tmp_path, path)
+    return path, corpus.meta["n_tokens"]
+
+
+def build_corpus(corpus_dir, documents, fingerprint):
+    """
+    Tokenize (key, text) pairs with splitSentences and store them under corpus_dir.
+    The corpus is written to a temporary folder and swapped in only once every
+    document was read, so an interrupted or failed build never leaves a half-written
+    corpus behind; an error reading the documents propagates to the caller.
+    """
+    tmp_dir = f"{corpus_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        _write_corpus(tmp_dir, documents, fingerprint)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    shutil.rmtree(corpus_dir, ignore_errors=True)
+    os.replace(tmp_dir, corpus_dir)
+    return TokenCorpus(corpus_dir)
+
+
+def _write_corpus(directory, documents, fingerprint):
+    word_ids = {}
+    vocab = []
+    keys = []
+    sentence_offsets = [0]
+    doc_offsets = [0]
+    n_tokens = 0
+    with open(os.path.join(directory, "tokens.int32"), "wb") as f:
+        for key, text in documents:
+            ids = []
+            # An empty CSV cell arrives as NaN: stored as a document without sentences
+            for sentence in splitSentences(text) if isinstance(text, str) else []:
+                for word in sentence:
+                    word_id = word_ids.get(word)
+                    if word_id is None:
+                        word_id = word_ids[word] = len(vocab)
+                        vocab.append(word)
+                    ids.append(word_id)
+                sentence_offsets.append(n_tokens + len(ids))
+            np.asarray(ids, dtype=np.int32).tofile(f)
+            n_tokens += len(ids)
+            doc_offsets.append(len(sentence_offsets) - 1)
+            # numpy scalars from a DataFrame index are not JSON serializable
+            keys.append(key.item() if hasattr(key, "item") else key)
+
+    np.asarray(sentence_offsets, dtype=np.int64).tofile(os.path.join(directory, "sentence_offsets.int64"))
+    np.asarray(doc_offsets, dtype=np.int64).tofile(os.path.join(directory, "doc_offsets.int64"))
+    with open(os.path.join(directory, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(vocab, f, ensure_ascii=False)
+    with open(os.path.join(directory, "keys.json"), "w", encoding="utf-8") as f:
+        json.dump(keys, f)
+    meta = {
+        "fingerprint": fingerprint,
+        "tokenizer_version": TOKENIZER_VERSION,
+        "n_documents": len(keys),
+        "n_sentences": len(sentence_offsets) - 1,
+        "n_tokens": n_tokens,
+        "vocab_size": len(vocab),
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_or_build_corpus(corpus_dir, documents_fn, fingerprint):
+    """
+    Open the corpus stored under corpus_dir if it was built from the same input
+    (same fingerprint and tokenizer version); otherwise tokenize documents_fn() and store it.
+    """
+    fingerprint = f"{fingerprint}:{stop_words_fingerprint()}:{TOKENIZER_VERSION}"
+    meta_path = os.path.join(corpus_dir, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("fingerprint") == fingerprint:
+            return TokenCorpus(corpus_dir)
+    print(f"Tokenizing {corpus_dir}")
+    return build_corpus(corpus_dir, documents_fn(), fingerprint)
+
+
+def stop_words_fingerprint():
+    return hashlib.sha256(" ".join(sorted(get_stop_words())).encode("utf-8")).hexdigest()[:16]
+
+
+def corpus_dir_for(source_path, corpus_base=CORPUS_BASE):
+    """
+    Folder of the corpus built from source_path. Named after the file and its resolved
+    path, so files of the same name in different folders get corpora of their own.
+    """
+    path_hash = hashlib.sha256(os.path.realpath(source_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(corpus_base, f"{os.path.basename(source_path)}_{path_hash}")
+
+
+def _text_file_documents(file_name, with_ids):
+    try:
+        with open(file_name, 'r', encoding="utf-8") as file:
+            for line_number, line in enumerate(file):
+                key = line_number
+                if with_ids and ':' in line:
+                    key, line = line.split(':', 1)
+                    key = key.strip()
+                yield key, line
+    except UnicodeDecodeError:
+        # Raised so the build is abandoned rather than stored cut short under the file's fingerprint
+        print(f"Unicode decode error in {file_name}")
+        raise
+
+
+def text_file_corpus(file_name, with_ids=False, corpus_base=CORPUS_BASE):
+    """
+    Token corpus of a cleaned text file with one document per line, tokenized
+    only when the file's contents change. With with_ids, lines look like "bill_id: text"
+    and the bill id becomes the document key; otherwise the key is the line number.
+    """
+    return load_or_build_corpus(corpus_dir_for(file_name, corpus_base),
+                                lambda: _text_file_documents(file_name, with_ids),
+                                f"{file_sha256(file_name)}:{with_ids}")
+
+
+def dataframe_corpus(df, text_column, corpus_dir):
+    """
+    Token corpus of one text column of a DataFrame, keyed by the DataFrame index.
+    Tokenized only when the texts change, so scoring columns added to the same file do not trigger a rebuild.
+    """
+    digest = hashlib.sha256()
+    for text in df[text_column]:
+        digest.update(str(text).encode("utf-8"))
+        digest.update(b"\0")
+    return load_or_build_corpus(corpus_dir,
+                                lambda: zip(df.index, df[text_column]),
+                                f"{text_column}:{digest.hexdigest()}")
+
+
+if __name__ == "__main__":
+    # Tokenize the training and full-text files once so training and scoring start from the mmap
+    for code in [18, 19, 28, 29]:
+        for file_name in [f"cleanedTextFull/{code}/Training/training_text{code}.txt",
+                          f"cleanedTextFull/{code}_17 to 39 fullText.txt"]:
+            if os.path.exists(file_name):
+                corpus = text_file_corpus(file_name)
+                print(f"{file_name}: {corpus.meta['n_documents']} documents, "
+                      f"{corpus.meta['n_sentences']} sentences, {corpus.meta['n_tokens']} tokens")
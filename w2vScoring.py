@@ -0,0 +1,527 @@
+import json
+import os
+
+import numpy as np
+from scipy.special import expit as sigmoid
+
+CATEGORIES = {'FailedCommons': 18, 'FailedLords': 19, "SuccesCommons": 28, "SuccessLords": 29}
+MODEL_DESCRIPTION = "workers=4, hs=1, sg=1, negative=0, min_count=10, vector_size =300,window = 7"
+# Where the full-text training notebook saves the four category models
+MODEL_PATHS = {key: f"{key}_word2vec_{MODEL_DESCRIPTION}.model" for key in CATEGORIES}
+# The titles models saved by the titles training notebook
+TITLE_MODEL_PATHS = {key: f"{key}_word2vec_titles.model" for key in CATEGORIES}
+
+# Rows of the Gram matrix computed per BLAS call; a typical sentence fits in one block
+BLOCK_SIZE = 256
+# Tokens per batch in the multi-model scorer, bounds its (C, tokens, D) temporaries
+TOKEN_BLOCK_SIZE = 2048
+# Storage formats MultiModelScorer can score from; int8 keeps one float32 scale per row
+PRECISIONS = ("float32", "float16", "int8")
+# Early exit: sentences scored per step, sentences scored before the first test, and how many
+# standard errors the leading class's mean must be ahead of every other class by to stop
+EARLY_EXIT_STEP = 64
+EARLY_EXIT_MIN_SENTENCES = 128
+EARLY_EXIT_MARGIN = 4.0
+
+
+def _keyed_vectors(model):
+    # Accept a full Word2Vec model or just its KeyedVectors
+    return getattr(model, "wv", model)
+
+
+# input (sentence: list of words, model: gensim model, window: window= windowSize of word2vec,
+#debug: print intermediate calculations for debugging)
+
+def score_sentence_reference(sentence, model, window=7, debug=False):
+    """
+    The original per-pair scorer (Equation 1), kept as the reference the vectorized scorer is checked against.
+    """
+    log_prob = 0.0 # total log prob for the sentence
+    sentence_length = len(sentence)
+    word_pair_probs = []
+
+    # Code for equation 1
+    for index, center_word in enumerate(sentence):
+        if center_word not in model.wv:
+            if debug:
+                print(f"Center word '{center_word}' not in vocabulary.")
+            continue
+        center_vector = model.wv[center_word]
+
+        start = max(0, index - window)
+        end = min(sentence_length, index + window + 1)
+
+        for j in range(start, end):
+            if j == index:
+                continue
+            context_word = sentence[j]
+            if context_word not in model.wv:
+                if debug:
+                    print(f"Context word '{context_word}' not in vocabulary.")
+                continue
+            context_vector = model.wv[context_word]
+
+            dot_product = np.dot(center_vector, context_vector)
+            prob = sigmoid(dot_product)
+
+            word_pair_probs.append((center_word, context_word, prob))
+
+            log_prob += np.log(prob + 1e-10)
+
+    if debug:
+        print("\n--- Word Pair Probabilities ---")
+        for center, context, prob in word_pair_probs:
+            print(f"p({context} | {center}) = {prob:.6f}")
+
+    return log_prob
+
+
+def sentence_rows(sentence, wv):
+    """
+    Positions and vector rows of the in-vocabulary words of a sentence.
+    Out-of-vocabulary words are dropped but still count towards the window through the positions.
+    """
+    key_to_index = wv.key_to_index
+    positions = []
+    rows = []
+    for position, word in enumerate(sentence):
+        row = key_to_index.get(word)
+        if row is not None:
+            positions.append(position)
+            rows.append(row)
+    return np.asarray(positions, dtype=np.int64), np.asarray(rows, dtype=np.int64)
+
+
+def band_pairs(positions, window, sentence_ids=None):
+    """
+    Index pairs (i, j), i < j, of the words at most window positions apart
+    (and in the same sentence, when the words of several sentences are passed together).
+    """
+    first, second = [], []
+    for k in range(1, window + 1):
+        if k >= len(positions):
+            break
+        in_band = positions[k:] - positions[:-k] <= window
+        if sentence_ids is not None:
+            in_band &= sentence_ids[k:] == sentence_ids[:-k]
+        i = np.nonzero(in_band)[0]
+        first.append(i)
+        second.append(i + k)
+    if not first:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(first), np.concatenate(second)
+
+
+def banded_log_prob(positions, vectors, window):
+    """
+    Sum of log(sigmoid(v_i . v_j) + 1e-10) over every ordered pair of words at most
+    window positions apart, the same sum score_sentence_reference accumulates pair by pair.
+
+    The dots come from one Gram matrix product per block of rows, restricted to the
+    columns that can fall inside the window. The +1e-10 floor of the original is kept
+    so the scores stay identical; expit itself does not overflow.
+    """
+    n = len(positions)
+    total = 0.0
+    for a in range(0, n, BLOCK_SIZE):
+        b = min(a + BLOCK_SIZE, n)
+        # Consecutive in-vocabulary words are at least one position apart, so no
+        # context word can be more than window rows away
+        lo = max(0, a - window)
+        hi = min(n, b + window)
+        dots = vectors[a:b] @ vectors[lo:hi].T
+        distance = np.abs(positions[a:b, None] - positions[None, lo:hi])
+        band = (distance <= window) & (distance > 0)
+        probs = sigmoid(dots[band])
+        total += float(np.log(probs.astype(np.float64) + 1e-10).sum())
+    return total
+
+
+def score_sentence(sentence, model, window=7, pair_cache=None):
+    """
+    Log-likelihood of a sentence under a model (Equation 1), vectorized over the window.
+    With a pairScoreCache.PairScoreCache the pair scores are looked up instead of recomputed.
+    """
+    wv = _keyed_vectors(model)
+    positions, rows = sentence_rows(sentence, wv)
+    if len(positions) < 2:
+        return 0.0
+    if pair_cache is not None:
+        # Both orders of a pair score the same, so each unordered pair counts twice
+        first, second = band_pairs(positions, window)
+        return 2 * float(pair_cache.log_probs(rows[first], rows[second]).sum())
+    return banded_log_prob(positions, wv.vectors[rows], window)
+
+
+# Score an entire document (S sentences) under all models (Equation 2)
+# input (sentencces:  a list of sentences ,models: the dictionary of models, window: the window size for score sentences)
+# outpur: a sentences x categories (failed , succesful ....) with eahc sentence score according to score_sentence
+
+def score_document_cached(sentences, model, pair_cache, window=5):
+    """
+    One column of score_document, with every pair of the document looked up in pair_cache in one batch.
+    """
+    wv = _keyed_vectors(model)
+    positions, rows, sentence_ids = [], [], []
+    for s_idx, sentence in enumerate(sentences):
+        sentence_positions, sentence_rows_ = sentence_rows(sentence, wv)
+        positions.append(sentence_positions)
+        rows.append(sentence_rows_)
+        sentence_ids.append(np.full(len(sentence_rows_), s_idx, dtype=np.int64))
+    if not rows:
+        return np.zeros(0)
+    positions, rows, sentence_ids = np.concatenate(positions), np.concatenate(rows), np.concatenate(sentence_ids)
+
+    first, second = band_pairs(positions, window, sentence_ids)
+    log_probs = pair_cache.log_probs(rows[first], rows[second])
+    # Both orders of a pair score the same, so each unordered pair counts twice
+    return np.bincount(sentence_ids[first], weights=2 * log_probs, minlength=len(sentences))
+
+
+def is_decisive(sentence_scores, margin=EARLY_EXIT_MARGIN):
+    """
+    Sequential test on the sentences scored so far: True if the class with the highest
+    mean leads every other class by more than margin standard errors of the
+    per-sentence difference, so scoring the rest is very unlikely to change the argmax.
+    """
+    n = len(sentence_scores)
+    if n < 2 or sentence_scores.shape[1] < 2:
+        return False
+    leader = np.argmax(sentence_scores.mean(axis=0))
+    differences = np.delete(sentence_scores[:, [leader]] - sentence_scores, leader, axis=1)
+    standard_errors = differences.std(axis=0, ddof=1) / np.sqrt(n)
+    return bool(np.all(differences.mean(axis=0) > margin * standard_errors))
+
+
+def score_until_decisive(n_sentences, score_range, margin=EARLY_EXIT_MARGIN,
+                         min_sentences=EARLY_EXIT_MIN_SENTENCES, step=EARLY_EXIT_STEP):
+    """
+    Score sentences in order, step at a time, with score_range(start, stop) -> scores of
+    sentences start..stop-1, until is_decisive or the document runs out.
+
+    Returns the scores of the sentences actually scored, so len() of the result is how
+    many were needed. A close decision scores every sentence and is exactly score_document.
+    """
+    blocks = []
+    scored = 0
+    while scored < n_sentences:
+        stop = min(n_sentences, max(scored + step, min_sentences))
+        blocks.append(score_range(scored, stop))
+        scored = stop
+        if scored < n_sentences and is_decisive(np.concatenate(blocks), margin):
+            break
+    return np.concatenate(blocks) if blocks else np.zeros((0, 0))
+
+
+def score_document(sentences, models, window=5, pair_caches=None, early_exit=False, margin=EARLY_EXIT_MARGIN):
+    """
+    Compute the score x category matrix of sentence scores for a document.
+
+    sentences: list of sentences, each sentence is a list of words
+    models: dict of {category: Word2Vec model}
+    pair_caches: optional dict of {category: PairScoreCache}
+    early_exit: stop once is_decisive(margin); only the scored sentences' rows are returned
+    """
+    if early_exit:
+        return score_until_decisive(
+            len(sentences), lambda start, stop: score_document(sentences[start:stop], models, window, pair_caches),
+            margin).reshape(-1, len(models))
+
+    S = len(sentences)
+    C = len(models)
+    pair_caches = pair_caches or {}
+
+    sentence_scores = np.zeros((S, C))
+
+    for c_idx, (category, model) in enumerate(models.items()):
+        if category in pair_caches:
+            sentence_scores[:, c_idx] = score_document_cached(sentences, model, pair_caches[category], window)
+
+    for s_idx, sentence in enumerate(sentences):
+        for c_idx, (category, model) in enumerate(models.items()):
+            if category not in pair_caches:
+                sentence_scores[s_idx, c_idx] = score_sentence(sentence, model, window)
+
+    return sentence_scores
+
+
+def score_document_reference(sentences, models, window=5):
+    """
+    score_document with the original per-pair scorer.
+    """
+    sentence_scores = np.zeros((len(sentences), len(models)))
+    for s_idx, sentence in enumerate(sentences):
+        for c_idx, model in enumerate(models.values()):
+            sentence_scores[s_idx, c_idx] = score_sentence_reference(sentence, model, window)
+    return sentence_scores
+
+
+def quantize_rows(vectors):
+    """
+    Symmetric int8 quantization with one scale per row: vectors ~= q * scales[..., None].
+    """
+    scales = (np.abs(vectors).max(axis=-1) / 127).astype(np.float32)
+    safe = np.where(scales > 0, scales, 1)
+    q = np.clip(np.rint(vectors / safe[..., None]), -127, 127).astype(np.int8)
+    return q, scales
+
+
+class MultiModelScorer:
+    """
+    Scores documents under every category model at once.
+
+    The vocabularies of the models are merged into one index when the scorer is
+    built. Their vectors are stacked into a (C, V, D) array, zero where a model
+    does not know a word, with a (C, V) presence mask. Scoring a document then
+    maps each word to the shared index once and computes the S x C
+    sentence_scores matrix with one batched Gram product per block of tokens,
+    instead of looping over sentences x categories.
+
+    with_precision() gives a copy that stores the vectors as float16, or as int8
+    with a float32 scale per row, at a half or a quarter of the memory. Only the
+    rows a block of tokens touches are widened back to float32 for scoring.
+    """
+
+    def __init__(self, models, window=7):
+        self.categories = list(models.keys())
+        self.window = window
+        keyed_vectors = [_keyed_vectors(model) for model in models.values()]
+        if len({wv.vector_size for wv in keyed_vectors}) > 1:
+            raise ValueError("All models must have the same vector size to be stacked.")
+
+        self.word_index = {}
+        for wv in keyed_vectors:
+            for word in wv.index_to_key:
+                self.word_index.setdefault(word, len(self.word_index))
+
+        C, V, D = len(keyed_vectors), len(self.word_index), keyed_vectors[0].vector_size
+        self.vectors = np.zeros((C, V, D), dtype=np.float32)
+        self.present = np.zeros((C, V), dtype=bool)
+        for c, wv in enumerate(keyed_vectors):
+            rows = [self.word_index[word] for word in wv.index_to_key]
+            self.vectors[c, rows] = wv.vectors
+            self.present[c, rows] = True
+        self.scales = None
+        self._corpus_maps = {}
+
+    @property
+    def precision(self):
+        return "int8" if self.scales is not None else self.vectors.dtype.name
+
+    def with_precision(self, precision):
+        """
+        A scorer sharing this one's vocabulary with its vectors stored in precision.
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+        vectors = self._rows(slice(None))
+        scorer = self.__class__.__new__(self.__class__)
+        scorer.categories = self.categories
+        scorer.window = self.window
+        scorer.word_index = self.word_index
+        scorer.present = self.present
+        scorer.scales = None
+        scorer._corpus_maps = {}
+        if precision == "int8":
+            scorer.vectors, scorer.scales = quantize_rows(vectors)
+        else:
+            scorer.vectors = vectors.astype(precision)
+        return scorer
+
+    def nbytes(self):
+        return self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def _rows(self, ids):
+        # (C, len(ids), D) float32 vectors of the given shared word ids
+        vectors = self.vectors[:, ids]
+        if self.scales is not None:
+            return vectors.astype(np.float32) * self.scales[:, ids, None]
+        return vectors.astype(np.float32, copy=False)
+
+    def save(self, directory):
+        """
+        Store the stacked vectors so other processes can open them with load().
+        """
+        tmp_dir = directory + ".tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        np.save(os.path.join(tmp_dir, "vectors.npy"), self.vectors)
+        np.save(os.path.join(tmp_dir, "present.npy"), self.present)
+        if self.scales is not None:
+            np.save(os.path.join(tmp_dir, "scales.npy"), self.scales)
+        words = sorted(self.word_index, key=self.word_index.get)
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"categories": self.categories, "window": self.window, "words": words}, f, ensure_ascii=False)
+        os.replace(tmp_dir, directory)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Open a saved scorer. The vectors are memory-mapped read-only, so every process
+        that loads the same directory shares one copy through the page cache.
+        """
+        scorer = cls.__new__(cls)
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        scorer.categories = meta["categories"]
+        scorer.window = meta["window"]
+        scorer.word_index = {word: i for i, word in enumerate(meta["words"])}
+        scorer.vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+        scorer.present = np.load(os.path.join(directory, "present.npy"))
+        scales_path = os.path.join(directory, "scales.npy")
+        scorer.scales = np.load(scales_path, mmap_mode="r") if os.path.exists(scales_path) else None
+        scorer._corpus_maps = {}
+        return scorer
+
+    def encode(self, sentences):
+        """
+        Flatten a document into (shared word ids, positions within the sentence, sentence ids),
+        dropping words no model knows.
+        """
+        ids, positions, sentence_ids = [], [], []
+        get = self.word_index.get
+        for s_idx, sentence in enumerate(sentences):
+            for position, word in enumerate(sentence):
+                word_id = get(word)
+                if word_id is not None:
+                    ids.append(word_id)
+                    positions.append(position)
+                    sentence_ids.append(s_idx)
+        return (np.asarray(ids, dtype=np.int64), np.asarray(positions, dtype=np.int64),
+                np.asarray(sentence_ids, dtype=np.int64))
+
+    def score_encoded(self, ids, positions, sentence_ids, n_sentences, window=None):
+        """
+        S x C sentence scores of an encoded document, equal to score_document under each model.
+
+        Pairs are taken one diagonal of the band at a time: for each offset k every token
+        is paired with the token k places later, for all C models in one array operation.
+        A pair counts if both words are in the same sentence, at most window positions
+        apart and known to that model. Each pair stands for both of its ordered pairs,
+        which have the same dot product, so it is counted twice.
+        """
+        window = self.window if window is None else window
+        C = len(self.categories)
+        sentence_scores = np.zeros((n_sentences, C))
+        n = len(ids)
+        for a in range(0, n, TOKEN_BLOCK_SIZE):
+            b = min(a + TOKEN_BLOCK_SIZE, n)
+            hi = min(n, b + window)
+            vectors = self._rows(ids[a:hi])
+            present = self.present[:, ids[a:hi]]
+            block_positions = positions[a:hi]
+            block_sentences = sentence_ids[a:hi]
+
+            first = block_sentences[0]
+            span = block_sentences[b - a - 1] - first + 1
+            block_scores = np.zeros(span * C)
+            # Consecutive known words are at least one position apart, so no pair is more than window tokens apart
+            for k in range(1, window + 1):
+                rows = min(b - a, hi - a - k)
+                if rows <= 0:
+                    break
+                in_band = ((block_sentences[:rows] == block_sentences[k:k + rows])
+                           & (block_positions[k:k + rows] - block_positions[:rows] <= window))
+                mask = in_band[None] & present[:, :rows] & present[:, k:k + rows]
+                if not mask.any():
+                    continue
+                dots = np.einsum("cnd,cnd->cn", vectors[:, :rows], vectors[:, k:k + rows])
+                c_idx, r_idx = np.nonzero(mask)
+                log_probs = np.log(sigmoid(dots[mask]).astype(np.float64) + 1e-10)
+                cells = (block_sentences[r_idx] - first) * C + c_idx
+                block_scores += np.bincount(cells, weights=2 * log_probs, minlength=span * C)
+            sentence_scores[first:first + span] += block_scores.reshape(span, C)
+        return sentence_scores
+
+    def score_document(self, sentences, window=None, early_exit=False, margin=EARLY_EXIT_MARGIN):
+        """
+        Compute the sentences x categories matrix of sentence scores for a document of word lists.
+        With early_exit only the sentences scored before is_decisive(margin) are returned.
+        """
+        if early_exit:
+            return score_until_decisive(
+                len(sentences), lambda start, stop: self.score_document(sentences[start:stop], window),
+                margin).reshape(-1, len(self.categories))
+        ids, positions, sentence_ids = self.encode(sentences)
+        return self.score_encoded(ids, positions, sentence_ids, len(sentences), window)
+
+    def _corpus_map(self, corpus):
+        # corpus vocabulary id -> shared word id (-1 if no model knows the word), built once per corpus
+        key = corpus.corpus_dir
+        if key not in self._corpus_maps:
+            self._corpus_maps[key] = np.array([self.word_index.get(word, -1) for word in corpus.vocab],
+                                              dtype=np.int64)
+        return self._corpus_maps[key]
+
+    def score_corpus_document(self, corpus, i, window=None, early_exit=False, margin=EARLY_EXIT_MARGIN):
+        """
+        score_document for document i of a TokenCorpus, read straight from its token arrays.
+        """
+        first_sentence, end_sentence = int(corpus.doc_offsets[i]), int(corpus.doc_offsets[i + 1])
+        if early_exit:
+            return score_until_decisive(
+                end_sentence - first_sentence,
+                lambda start, stop: self._score_sentence_range(corpus, first_sentence + start,
+                                                               first_sentence + stop, window),
+                margin).reshape(-1, len(self.categories))
+        return self._score_sentence_range(corpus, first_sentence, end_sentence, window)
+
+    def _score_sentence_range(self, corpus, first_sentence, end_sentence, window):
+        offsets = np.asarray(corpus.sentence_offsets[first_sentence:end_sentence + 1])
+        n_sentences = end_sentence - first_sentence
+        lengths = np.diff(offsets)
+
+        tokens = corpus.tokens[offsets[0]:offsets[-1]]
+        sentence_ids = np.repeat(np.arange(n_sentences), lengths)
+        positions = np.arange(len(tokens)) - np.repeat(offsets[:-1] - offsets[0], lengths)
+        ids = self._corpus_map(corpus)[tokens] if len(tokens) else np.zeros(0, dtype=np.int64)
+
+        known = ids >= 0
+        return self.score_encoded(ids[known], positions[known], sentence_ids[known], n_sentences, window)
+
+
+# calculate document probabilities (Equation 5)
+
+# input: the sxc array
+# output: a 1x cateories array with the average score for all sentences in document
+def document_probabilities(sentence_scores):
+
+    return sentence_scores.mean(axis=0)
+
+
+# compute class probabilities ( Equation 3)
+
+# input:  the array from document_probabilities
+#ouput: normalized probabilities after bayes rule is applied #todo: change the priors to correspond to each class
+def class_probabilities(doc_probs):
+    """
+    Compute class probabilities using Bayes rule.
+    Assuming uniform priors.
+    """
+    priors = np.ones(len(doc_probs)) / len(doc_probs)
+    # bayes rule
+    probs = (doc_probs * priors) / np.sum(doc_probs * priors)
+    return probs
+
+
+# classify the document (Equation 6)
+# checks which of the numbers in the 1d array from document probabilities (the average across the classes ) is biggest and returns the index and array (for debuging)
+
+def classify_document(sentence_scores):
+    doc_probs = document_probabilities(sentence_scores)
+    predicted_class_idx = np.argmax(doc_probs)
+    return predicted_class_idx, doc_probs
+
+
+# classify with early exit: scores only as many sentences as the decision needs
+# returns the index, the doc probs of the scored sentences and how many sentences were scored
+
+def classify_document_early_exit(sentences, models, window=5, margin=EARLY_EXIT_MARGIN):
+    """
+    models: dict of {category: model} or a MultiModelScorer.
+    """
+    if isinstance(models, MultiModelScorer):
+        sentence_scores = models.score_document(sentences, window, early_exit=True, margin=margin)
+    else:
+        sentence_scores = score_document(sentences, models, window, early_exit=True, margin=margin)
+    predicted_class_idx, doc_probs = classify_document(sentence_scores)
+    return predicted_class_idx, doc_probs, len(sentence_scores)
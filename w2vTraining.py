@@ -0,0 +1,273 @@
+import hashlib
+import heapq
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from streamingCorpus import StreamingCorpus
+from tokenCorpus import TokenCorpus, line_sentence_file, text_file_corpus
+from w2vScoring import CATEGORIES, MODEL_PATHS
+
+TRAINING_DIR = "modelTraining"
+# The settings of the full-text category models (MODEL_DESCRIPTION in w2vScoring)
+W2V_PARAMS = {"hs": 1, "sg": 1, "negative": 0, "min_count": 10, "vector_size": 300, "window": 7}
+EPOCHS = 20
+ALPHA_DECAY = 0.9
+SHUFFLE_SEED = 0
+# Incremental updates start below the 0.025 of a fresh model, so a new session refines the
+# existing vectors instead of overwriting them, and decay by ALPHA_DECAY every epoch
+UPDATE_EPOCHS = 10
+UPDATE_ALPHA = 0.01
+# Models saved before sessions were recorded were all trained on sessions 17-39
+DEFAULT_SESSIONS = list(range(17, 40))
+
+
+def training_file(code):
+    return f"cleanedTextFull/{code}/Training/training_text{code}.txt"
+
+
+def full_text_file(code, start_session, end_session):
+    return f"cleanedTextFull/{code}_{start_session} to {end_session} fullText.txt"
+
+
+def sessions_seen(model):
+    """
+    Parliamentary sessions whose bills a category model has been trained on.
+    """
+    return sorted(getattr(model, "sessions", DEFAULT_SESSIONS))
+
+
+def epoch_alphas(epochs, alpha=0.025, min_alpha=0.0001, decay=ALPHA_DECAY):
+    """
+    (start, end) learning rate of every epoch, the schedule trainW2V produced: the first
+    epoch decays from alpha to min_alpha, after which each epoch runs at a constant rate
+    decay times the previous one.
+    """
+    return [(alpha, min_alpha)] + [(alpha * decay ** epoch,) * 2 for epoch in range(1, epochs)]
+
+
+def build_shared_vocab(vocab_corpora, params=W2V_PARAMS, training_dir=TRAINING_DIR, workers=None):
+    """
+    Build the vocabulary of all sentences once and save the initialized model as the
+    template every category model is cloned from. The template is reused as long as the
+    corpora and parameters are unchanged. Returns its path.
+    """
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8"))
+    for corpus in vocab_corpora:
+        digest.update(corpus.meta["fingerprint"].encode("utf-8"))
+    path = os.path.join(training_dir, f"shared_vocab_{digest.hexdigest()[:16]}.model")
+    if os.path.exists(path):
+        return path
+    sentences = StreamingCorpus([corpus.corpus_dir for corpus in vocab_corpora])
+    return build_vocab_template(sentences, path, params, workers)
+
+
+def build_vocab_template(sentences, path, params=W2V_PARAMS, workers=None):
+    """
+    Save a Word2Vec model with the vocabulary of sentences and freshly initialized weights at path.
+    """
+    from gensim.models import Word2Vec
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    start = time.perf_counter()
+    model = Word2Vec(workers=workers or os.cpu_count(), **params)
+    model.build_vocab(corpus_iterable=sentences)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    model.save(tmp_path)
+    os.replace(tmp_path, path)
+    print(f"Shared vocabulary: {len(model.wv.index_to_key)} words in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def train_category(task):
+    """
+    Clone the template and train it on one category's sentences with the trainW2V schedule.
+    Runs in its own process, so the four models train side by side. corpus is a token
+    corpus folder or a StreamingCorpus over part of one (streamed, so no corpus_file).
+    """
+    from gensim.models import Word2Vec
+
+    key, template_path, corpus, output_path, epochs, threads, use_corpus_file, sessions = task
+    start = time.perf_counter()
+    model = Word2Vec.load(template_path)
+    model.workers = threads
+
+    if use_corpus_file:
+        # gensim reads the file from every thread at its own offset, so one model uses all its cores;
+        # the sentence order is fixed instead of reshuffled every epoch
+        corpus_file, total_words = line_sentence_file(TokenCorpus(corpus))
+    elif isinstance(corpus, StreamingCorpus):
+        sentences = corpus
+    else:
+        # Streamed from disk and block-shuffled anew on every pass
+        sentences = StreamingCorpus(corpus, seed=SHUFFLE_SEED)
+
+    for start_alpha, end_alpha in epoch_alphas(epochs, model.alpha, model.min_alpha):
+        if use_corpus_file:
+            model.train(corpus_file=corpus_file, total_words=total_words, epochs=1,
+                        start_alpha=start_alpha, end_alpha=end_alpha)
+        else:
+            model.train(sentences, total_examples=len(sentences), epochs=1,
+                        start_alpha=start_alpha, end_alpha=end_alpha)
+    model.alpha = model.min_alpha = end_alpha
+    model.sessions = sessions
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    model.save(output_path)
+    return key, output_path, time.perf_counter() - start
+
+
+def train_all(start_session=17, end_session=39, categories=CATEGORIES, output_paths=MODEL_PATHS,
+              epochs=EPOCHS, params=W2V_PARAMS, use_corpus_file=False, processes=None):
+    """
+    Train one Word2Vec model per category from a shared vocabulary.
+
+    The vocabulary of the sessions' full texts of every category is built once and cloned
+    into each category model, which is then trained on that category's training text in a
+    separate process, with the cores split evenly between them. Returns {category: model path}.
+    """
+    vocab_corpora = [text_file_corpus(full_text_file(code, start_session, end_session))
+                     for code in categories.values()]
+    training_corpora = {key: text_file_corpus(training_file(code)) for key, code in categories.items()}
+    template_path = build_shared_vocab(vocab_corpora, params)
+
+    processes = processes or len(categories)
+    threads = max(1, (os.cpu_count() or 1) // processes)
+    sessions = list(range(start_session, end_session + 1))
+    tasks = [(key, template_path, corpus.corpus_dir, output_paths[key], epochs, threads, use_corpus_file, sessions)
+             for key, corpus in training_corpora.items()]
+    return _run_in_processes(train_category, tasks, processes, "trained")
+
+
+def _run_in_processes(fn, tasks, processes, verb):
+    model_paths = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for key, path, seconds in executor.map(fn, tasks):
+            print(f"{key}: {verb} in {seconds:.1f}s -> {path}")
+            model_paths[key] = path
+    print(f"{verb.capitalize()} {len(model_paths)} models in {time.perf_counter() - start:.1f}s")
+    return model_paths
+
+
+def keep_binary_tree(wv, old_codes, old_points):
+    """
+    Put back an hs model's Huffman tree after build_vocab(update=True).
+
+    gensim rebuilds the tree from the updated counts, so the words' codes stop matching
+    the inner-node weights in syn1 and training the new session starts from an output
+    layer that no longer encodes anything learned before. Instead the old tree is kept
+    whole under a new root, with a Huffman tree of the new words as its other branch:
+    every old inner node keeps its syn1 row and the new nodes take the rows gensim adds.
+    """
+    n_old = len(old_codes)
+    if len(wv) == n_old:
+        for i in range(n_old):
+            wv.set_vecattr(i, "code", old_codes[i])
+            wv.set_vecattr(i, "point", old_points[i])
+        return
+
+    # Inner nodes are numbered len(wv) + their syn1 row, leaves by their word index
+    heap = [(int(wv.get_vecattr(i, "count")), i) for i in range(n_old, len(wv))]
+    heapq.heapify(heap)
+    children = {}
+    row = n_old - 1
+    while len(heap) > 1:
+        (left_count, left), (right_count, right) = heapq.heappop(heap), heapq.heappop(heap)
+        children[len(wv) + row] = (left, right)
+        heapq.heappush(heap, (left_count + right_count, len(wv) + row))
+        row += 1
+    root = np.array([row], dtype=np.uint32)
+
+    for i in range(n_old):
+        wv.set_vecattr(i, "code", np.concatenate([[0], old_codes[i]]).astype(np.uint8))
+        wv.set_vecattr(i, "point", np.concatenate([root, old_points[i]]).astype(np.uint32))
+    stack = [(heap[0][1], np.array([1], dtype=np.uint8), root)]
+    while stack:
+        node, code, point = stack.pop()
+        if node < len(wv):
+            wv.set_vecattr(node, "code", code)
+            wv.set_vecattr(node, "point", point)
+            continue
+        point = np.append(point, np.uint32(node - len(wv)))
+        left, right = children[node]
+        stack.append((left, np.append(code, np.uint8(0)), point))
+        stack.append((right, np.append(code, np.uint8(1)), point))
+
+
+def update_category(task):
+    """
+    Continue training a saved category model on one new session's sentences.
+
+    The vocabulary grows with the words of the new session only, and training runs
+    over the new sentences alone, so the cost follows the size of the session rather
+    than of the whole history. A session the model has already seen is skipped.
+    On hs models the existing Huffman tree is kept (see keep_binary_tree), so the
+    inner-node weights go on matching the codes they were trained with.
+    """
+    from gensim.models import Word2Vec
+
+    key, model_path, corpus_dir, output_path, session, epochs, alpha, threads = task
+    if epochs < 1:
+        raise ValueError(f"An update needs at least one epoch, got {epochs}")
+    start = time.perf_counter()
+    model = Word2Vec.load(model_path)
+    if session in sessions_seen(model):
+        print(f"{key} has already seen session {session}")
+        return key, model_path, 0.0
+
+    model.workers = threads
+    sentences = StreamingCorpus(corpus_dir, seed=SHUFFLE_SEED)
+    if model.hs:
+        old_codes = [model.wv.get_vecattr(i, "code") for i in range(len(model.wv))]
+        old_points = [model.wv.get_vecattr(i, "point") for i in range(len(model.wv))]
+    # update=True adds the new words and their counts; the existing vectors are kept
+    model.build_vocab(sentences, update=True)
+    if model.hs:
+        keep_binary_tree(model.wv, old_codes, old_points)
+    for epoch in range(epochs):
+        rate = alpha * ALPHA_DECAY ** epoch
+        model.train(sentences, total_examples=len(sentences), epochs=1, start_alpha=rate, end_alpha=rate)
+    model.alpha = model.min_alpha = rate
+    model.sessions = sessions_seen(model) + [session]
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    model.save(tmp_path)
+    os.replace(tmp_path, output_path)
+    return key, output_path, time.perf_counter() - start
+
+
+def update_session(session, categories=CATEGORIES, model_paths=MODEL_PATHS, session_files=None,
+                   output_paths=None, epochs=UPDATE_EPOCHS, alpha=UPDATE_ALPHA, processes=None):
+    """
+    Bring every category model up to date with one new parliamentary session, in parallel.
+
+    session_files maps each category to that session's cleaned text, one bill per line
+    (by default cleanedTextFull/{code}_{session} to {session} fullText.txt). The updated
+    models replace model_paths unless output_paths is given. Returns {category: model path}.
+    """
+    session_files = session_files or {key: full_text_file(code, session, session)
+                                      for key, code in categories.items()}
+    output_paths = output_paths or model_paths
+    corpora = {key: text_file_corpus(session_files[key]) for key in categories}
+
+    processes = processes or len(categories)
+    threads = max(1, (os.cpu_count() or 1) // processes)
+    tasks = [(key, model_paths[key], corpus.corpus_dir, output_paths[key], session, epochs, alpha, threads)
+             for key, corpus in corpora.items()]
+    return _run_in_processes(update_category, tasks, processes, "updated")
+
+
+if __name__ == "__main__":
+    # python w2vTraining.py [--corpus-file]      retrain all four models over sessions 17-39
+    # python w2vTraining.py --update SESSION     add one new session to the saved models
+    if "--update" in sys.argv:
+        update_session(int(sys.argv[sys.argv.index("--update") + 1]))
+    else:
+        train_all(use_corpus_file="--corpus-file" in sys.argv)